@@ -0,0 +1,91 @@
+"""
+Асинхронное чтение каталога (категории, жанры, произведения) под ASGI.
+
+В Django 3.2 нет асинхронного ORM, поэтому данные по-прежнему читает
+DRF-представление в потоке исполнителя asgiref (thread_sensitive), а
+асинхронная обёртка сокращает число таких переходов: одинаковые
+анонимные GET-запросы, пришедшие одновременно, объединяются — первый
+выполняет представление, остальные ждут его результата и получают свою
+копию ответа. Запросы другими методами, с заголовком Authorization и
+условные запросы передаются синхронному представлению как есть.
+
+Включается настройкой CATALOGUE_ASYNC_VIEWS (см. api/urls.py). Под WSGI
+асинхронное представление выполняется через async_to_sync и только
+добавляет накладные расходы.
+"""
+import asyncio
+import weakref
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+
+# Заголовки, с которыми ответ зависит от клиента и не объединяется.
+PRIVATE_HEADERS = (
+    'HTTP_AUTHORIZATION', 'HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE',
+)
+
+# Выполняющиеся запросы по циклам событий: {цикл: {ключ: задача}}.
+_in_flight = weakref.WeakKeyDictionary()
+
+
+async def coalesce(key, func):
+    """
+    Выполняет func() в потоке исполнителя; одновременные вызовы с тем же
+    ключом не запускают func() повторно, а ждут результата первого.
+
+    func() выполняется отдельной задачей, которую все вызовы ждут через
+    shield: отмена любого из них, в том числе первого, не отменяет
+    результат для остальных.
+    """
+    loop = asyncio.get_running_loop()
+    in_flight = _in_flight.setdefault(loop, {})
+    task = in_flight.get(key)
+    if task is None:
+        task = in_flight[key] = loop.create_task(
+            sync_to_async(func, thread_sensitive=True)()
+        )
+
+        def forget(task):
+            del in_flight[key]
+            # Ожидающих может не остаться: исключение считается полученным,
+            # и asyncio не пишет его в лог как необработанное.
+            if not task.cancelled():
+                task.exception()
+
+        task.add_done_callback(forget)
+    return await asyncio.shield(task)
+
+
+def render(view, request, args, kwargs):
+    """Статус, тело и заголовки ответа синхронного представления."""
+    response = view(request, *args, **kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    return response.status_code, response.content, list(response.items())
+
+
+def catalogue_view(view):
+    """Асинхронное представление поверх DRF-представления каталога."""
+
+    async def async_view(request, *args, **kwargs):
+        if request.method != 'GET' or any(
+            header in request.META for header in PRIVATE_HEADERS
+        ):
+            return await sync_to_async(view, thread_sensitive=True)(
+                request, *args, **kwargs
+            )
+        key = (
+            request.get_host(), request.get_full_path(),
+            request.META.get('HTTP_ACCEPT', ''),
+        )
+        status, content, headers = await coalesce(
+            key, lambda: render(view, request, args, kwargs)
+        )
+        response = HttpResponse(content, status=status)
+        for name, value in headers:
+            response[name] = value
+        return response
+
+    # Как и у DRF-представлений: API аутентифицируется по JWT.
+    async_view.csrf_exempt = True
+    return async_view
@@ -0,0 +1,98 @@
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from . import replicas
+
+User = get_user_model()
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """
+    Неизменяемая проекция пользователя для аутентификации и проверки прав.
+
+    Содержит только поля, нужные разрешениям; полную запись пользователя
+    представления загружают сами, если она нужна.
+    """
+
+    id: int
+    username: str
+    role: str
+    is_superuser: bool
+    is_active: bool
+
+    is_authenticated = True
+    is_anonymous = False
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(
+            id=user.id, username=user.username, role=user.role,
+            is_superuser=user.is_superuser, is_active=user.is_active,
+        )
+
+    @property
+    def pk(self):
+        return self.id
+
+    @property
+    def is_admin(self):
+        return self.role == User.ADMIN or self.is_superuser
+
+    @property
+    def is_moderator(self):
+        return self.role == User.MODERATOR
+
+    def __str__(self):
+        return self.username
+
+
+def get_cache():
+    return caches[settings.AUTH_USER_CACHE_ALIAS]
+
+
+def cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def invalidate_user(user_id):
+    get_cache().delete(cache_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация с кешем проекции пользователя.
+
+    Пользователь читается из БД только при промахе кеша; запись живёт
+    AUTH_USER_CACHE_TIMEOUT секунд и удаляется при сохранении или
+    удалении пользователя.
+    """
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is not None:
+            replicas.route_user(result[0].pk)
+        return result
+
+    def get_user(self, validated_token):
+        # Проверка отзыва токена сравнивает хеш пароля из БД.
+        if api_settings.CHECK_REVOKE_TOKEN:
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                'Токен не содержит идентификатор пользователя'
+            )
+        key = cache_key(user_id)
+        user = get_cache().get(key)
+        if user is None:
+            user = CachedUser.from_user(super().get_user(validated_token))
+            get_cache().set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+        return user
@@ -0,0 +1,83 @@
+"""
+Кеш ответов каталога (категории, жанры, произведения).
+
+Ключ строится из хоста, пути и отсортированных параметров запроса и
+содержит текущую версию каталога. Любое изменение каталога меняет
+версию, поэтому старые ответы больше не читаются и вытесняются сами.
+Бэкенд задаётся настройкой CATALOGUE_CACHE_ALIAS из CACHES.
+"""
+from hashlib import md5
+from urllib.parse import urlencode
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+
+from . import replicas
+
+VERSION_KEY = 'catalogue:version'
+HITS_KEY = 'catalogue:hits'
+MISSES_KEY = 'catalogue:misses'
+
+
+def get_cache():
+    return caches[settings.CATALOGUE_CACHE_ALIAS]
+
+
+def get_version():
+    cache = get_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def invalidate():
+    """Сбрасывает все закешированные ответы каталога."""
+    # Случайная версия, а не счётчик: если ключ версии вытеснят,
+    # новая версия не совпадёт ни с одной из старых.
+    get_cache().set(VERSION_KEY, uuid4().hex, None)
+
+
+def make_key(request):
+    params = sorted(
+        (key, value)
+        for key in request.query_params
+        for value in request.query_params.getlist(key)
+    )
+    raw = f'{request.get_host()}{request.path}?{urlencode(params)}'
+    return f'catalogue:{get_version()}:{md5(raw.encode()).hexdigest()}'
+
+
+def get_response(request):
+    """Закешированные данные ответа или None; считает попадания."""
+    data = get_cache().get(make_key(request))
+    _incr(HITS_KEY if data is not None else MISSES_KEY)
+    return data
+
+
+def set_response(request, data):
+    timeout = settings.CATALOGUE_CACHE_TIMEOUT
+    # Реплика могла ещё не получить изменение, сбросившее версию, —
+    # такой ответ хранится не дольше допустимого отставания.
+    if replicas.reads_from_replica():
+        timeout = min(timeout, settings.DATABASE_REPLICA_STICKY_TIMEOUT)
+    get_cache().set(make_key(request), data, timeout)
+
+
+def get_stats():
+    cache = get_cache()
+    return {
+        'hits': cache.get(HITS_KEY, 0),
+        'misses': cache.get(MISSES_KEY, 0),
+    }
+
+
+def _incr(key):
+    cache = get_cache()
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
@@ -0,0 +1,74 @@
+"""
+Повторное использование соединений с БД и их оборот.
+
+При CONN_MAX_AGE > 0 Django не закрывает соединение после запроса, и
+следующий запрос того же потока получает его снова. Django 3.2 перед
+повторным использованием проверяет только возраст соединения, поэтому
+при DB_CONN_HEALTH_CHECKS check_connections() в начале запроса
+проверяет открытые соединения (is_usable) и закрывает разорванные:
+запрос откроет новое, а не упадёт на первом SQL.
+
+Счётчики ведутся отдельно в каждом процессе (воркере): запросы,
+открытые соединения, выданные из пула (при DB_POOL) и закрытые
+проверкой. churn — сколько соединений с БД в среднем открывается на
+запрос: около 0 при переиспользовании, около 1 при CONN_MAX_AGE = 0.
+Выдача из пула новым соединением не считается.
+"""
+import os
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections
+
+from api_yamdb.backends import pool
+
+_stats = Counter()
+_lock = threading.Lock()
+
+
+def count(name):
+    with _lock:
+        _stats[name] += 1
+
+
+def count_connect(connection):
+    """Подключение DatabaseWrapper: новое соединение или выдача из пула."""
+    count('checkouts' if getattr(connection, 'from_pool', False) else 'opened')
+
+
+def check_connections():
+    if not settings.DB_CONN_HEALTH_CHECKS:
+        return
+    for connection in connections.all():
+        if connection.connection is None or connection.in_atomic_block:
+            continue
+        if not connection.is_usable():
+            connection.close()
+            count('unhealthy')
+
+
+def get_stats():
+    with _lock:
+        stats = dict(_stats)
+    requests = stats.get('requests', 0)
+    opened = stats.get('opened', 0)
+    return {
+        'pid': os.getpid(),
+        'conn_max_age': {
+            alias: connections.databases[alias]['CONN_MAX_AGE']
+            for alias in connections
+        },
+        'health_checks': settings.DB_CONN_HEALTH_CHECKS,
+        'requests': requests,
+        'opened': opened,
+        'checkouts': stats.get('checkouts', 0),
+        'unhealthy': stats.get('unhealthy', 0),
+        'churn': round(opened / requests, 3) if requests else 0,
+        'pool': pool.get_stats() if settings.DB_POOL else None,
+    }
+
+
+def reset_stats():
+    with _lock:
+        _stats.clear()
@@ -1,11 +1,15 @@
 import django_filters
+from django.db.models import F
+from rest_framework.filters import OrderingFilter
 
 from reviews.models import Title
+from reviews.search import search_titles
 
 
 class TitleFilter(django_filters.FilterSet):
     genre = django_filters.CharFilter(field_name='genre__slug')
     category = django_filters.CharFilter(field_name='category__slug')
+    q = django_filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
@@ -14,4 +18,46 @@ class TitleFilter(django_filters.FilterSet):
             'category',
             'name',
             'year',
+            'q',
         )
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
+
+
+class TitleOrderingFilter(OrderingFilter):
+    """
+    Сортировка произведений по ?ordering=, например -rating,name.
+
+    Произведения без оценок всегда идут в конце, в какую бы сторону ни
+    шла сортировка. Для сортировок есть индексы (поле, id), так что
+    первая страница читается по индексу без сортировки всей таблицы.
+    """
+
+    ordering_fields = (
+        'rating', 'weighted_rating', 'year', 'name', 'reviews_count'
+    )
+    # Имя параметра в API -> поле модели.
+    aliases = {'reviews_count': 'rating_count'}
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+        result = []
+        for item in ordering:
+            desc = item.startswith('-')
+            field = item.lstrip('-')
+            field = self.aliases.get(field, field)
+            if queryset.model._meta.get_field(field).null:
+                expression = F(field)
+                result.append(
+                    expression.desc(nulls_last=True) if desc
+                    else expression.asc(nulls_last=True)
+                )
+            else:
+                result.append(f'-{field}' if desc else field)
+        # Первичный ключ делает порядок однозначным, как в KeysetPagination.
+        first_desc = ordering[0].startswith('-')
+        result.append('-pk' if first_desc else 'pk')
+        return result
@@ -1,8 +1,142 @@
-from rest_framework import filters, mixins
+from hashlib import md5
+from urllib.parse import urlencode
+
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import filters, mixins, status
+from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
+from reviews.models import Revision
+from . import cache
+
+
+class NotModified(Exception):
+
+    def __init__(self, response):
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """
+    ETag и Last-Modified для GET-запросов по ревизиям данных.
+
+    Валидаторы считаются одним запросом к таблице Revision по областям
+    из get_revision_scopes(), до выборки и сериализации ответа. Если
+    клиент прислал совпадающий If-None-Match или If-Modified-Since,
+    возвращается 304 без тела.
+    """
+
+    revision_scopes = ()
+
+    def get_revision_scopes(self):
+        return self.revision_scopes
+
+    def get_validators(self, request):
+        scopes = self.get_revision_scopes()
+        revisions = dict(
+            Revision.objects.filter(scope__in=scopes)
+            .values_list('scope', 'updated')
+        )
+        # Область ещё ни разу не менялась через API (например, данные
+        # загружены import_data) — валидировать не с чем.
+        if not scopes or len(revisions) < len(scopes):
+            return None
+        params = sorted(
+            (key, value)
+            for key in request.query_params
+            for value in request.query_params.getlist(key)
+        )
+        raw = '|'.join([
+            request.get_host(), request.path, urlencode(params),
+            str(request.user.pk), request.accepted_renderer.format,
+            *(revisions[scope].isoformat() for scope in scopes),
+        ])
+        etag = 'W/' + quote_etag(md5(raw.encode()).hexdigest())
+        return etag, int(max(revisions.values()).timestamp())
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.validators = None
+        if request.method in ('GET', 'HEAD'):
+            self.validators = self.get_validators(request)
+        if self.validators:
+            etag, last_modified = self.validators
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified
+            )
+            if response is not None:
+                raise NotModified(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs)
+        validators = getattr(self, 'validators', None)
+        if validators and response.status_code == status.HTTP_200_OK:
+            etag, last_modified = validators
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class CachedListMixin:
+    """Отдаёт список из кеша каталога, пока каталог не изменился."""
+
+    def list(self, request, *args, **kwargs):
+        data = cache.get_response(request)
+        if data is not None:
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set_response(request, response.data)
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+class ParentObjectMixin:
+    """
+    Родительский объект вложенного эндпоинта (произведение для отзывов,
+    отзыв для комментариев).
+
+    get_parent() читает родителя не больше одного раза за запрос, в том
+    числе из сериализатора через context['view']. Список родителя не
+    читает: выборка фильтруется по его id, а существование родителя
+    проверяется, только если страница оказалась пустой.
+    """
+
+    parent_model = None
+
+    def get_parent_filter(self):
+        raise NotImplementedError
+
+    def get_parent(self):
+        if not hasattr(self, '_parent'):
+            self._parent = get_object_or_404(
+                self.parent_model, **self.get_parent_filter()
+            )
+        return self._parent
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if not page and not self.parent_model.objects.filter(
+            **self.get_parent_filter()
+        ).exists():
+            raise Http404
+        return page
+
 
 class CreateListDeleteViewSet(
+    ConditionalGetMixin,
+    CachedListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.DestroyModelMixin,
@@ -12,3 +146,4 @@ class CreateListDeleteViewSet(
     lookup_field = 'slug'
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
+    revision_scopes = ('catalogue',)
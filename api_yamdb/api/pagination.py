@@ -0,0 +1,242 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from collections import OrderedDict
+
+from django.core.exceptions import (
+    FieldDoesNotExist, FieldError, ValidationError
+)
+from django.db.models import F, Field, OrderBy, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Пагинация по ключу (keyset).
+
+    Позиция страницы задаётся значениями полей сортировки последней
+    записи и первичным ключом, поэтому запрос любой страницы — это
+    индексированное условие WHERE без OFFSET и без COUNT(*).
+    Сортировка берётся из queryset (или Meta.ordering модели),
+    первичный ключ добавляется для однозначности. NULL в полях
+    сортировки идут после всех значений, как в TitleOrderingFilter.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = self.get_ordering(queryset)
+        self.nullable = self.get_nullable(queryset)
+        values, self.reverse = self.decode_cursor(
+            request, self.get_fields(queryset)
+        )
+        self.has_cursor = values is not None
+
+        ordering = self.ordering
+        if self.reverse:
+            ordering = [(field, not desc) for field, desc in ordering]
+        # При обратном проходе NULL оказываются в начале.
+        nulls_last = not self.reverse
+        if values is not None:
+            queryset = queryset.filter(
+                self.keyset_filter(ordering, values, nulls_last)
+            )
+        queryset = queryset.order_by(*(
+            self.order_by(field, desc, nulls_last)
+            for field, desc in ordering
+        ))
+
+        results = list(queryset[:self.page_size + 1])
+        self.has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.reverse:
+            results.reverse()
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_ordering(self, queryset):
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        result = []
+        for field in ordering:
+            if isinstance(field, OrderBy):
+                field, desc = field.expression.name, field.descending
+            else:
+                desc = field.startswith('-')
+                field = field.lstrip('-')
+            if field in ('pk', queryset.model._meta.pk.name):
+                break
+            result.append((field, desc))
+        result.append(('pk', result[0][1] if result else False))
+        return result
+
+    def get_nullable(self, queryset):
+        nullable = set()
+        for field, _ in self.ordering:
+            try:
+                if queryset.model._meta.get_field(field).null:
+                    nullable.add(field)
+            except FieldDoesNotExist:
+                # Аннотация или поле связанной модели.
+                continue
+        return nullable
+
+    def get_fields(self, queryset):
+        """
+        Поля сортировки для приведения значений курсора; None — если тип
+        неизвестен (например, у аннотации RawSQL без output_field, где
+        Django подставляет голый Field, пропускающий любое значение).
+        """
+        fields = []
+        for name, _ in self.ordering:
+            annotation = queryset.query.annotations.get(name)
+            try:
+                if annotation is not None:
+                    field = annotation.output_field
+                elif name == 'pk':
+                    field = queryset.model._meta.pk
+                else:
+                    field = queryset.model._meta.get_field(name)
+            except (FieldDoesNotExist, FieldError):
+                field = None
+            if type(field) is Field:
+                field = None
+            fields.append(field)
+        return fields
+
+    def to_python(self, name, field, value):
+        if value is None:
+            if name not in self.nullable:
+                raise ValueError(f'{name} не может быть null')
+            return None
+        if field is None:
+            if not isinstance(value, (int, float, str)):
+                raise TypeError(f'{name}: {value!r}')
+            return value
+        return field.to_python(value)
+
+    def order_by(self, field, desc, nulls_last):
+        if field not in self.nullable:
+            return f'-{field}' if desc else field
+        expression = F(field).desc if desc else F(field).asc
+        if nulls_last:
+            return expression(nulls_last=True)
+        return expression(nulls_first=True)
+
+    def keyset_filter(self, ordering, values, nulls_last=True):
+        """(a > x) OR (a = x AND b > y) OR ... для списка полей."""
+        condition = Q()
+        equal = Q()
+        for (field, desc), value in zip(ordering, values):
+            lookup = 'lt' if desc else 'gt'
+            if field not in self.nullable:
+                after = Q(**{f'{field}__{lookup}': value})
+            elif value is None:
+                # После NULL идут только значения, если NULL в начале.
+                after = None if nulls_last else Q(
+                    **{f'{field}__isnull': False}
+                )
+            else:
+                after = Q(**{f'{field}__{lookup}': value})
+                if nulls_last:
+                    after |= Q(**{f'{field}__isnull': True})
+            if after is not None:
+                condition |= equal & after
+            equal &= Q(**{field: value})
+        return condition
+
+    def get_position(self, obj):
+        position = []
+        for field, _ in self.ordering:
+            value = obj
+            for attr in field.split('__'):
+                value = getattr(value, attr)
+            position.append(value)
+        return position
+
+    def encode_cursor(self, obj, reverse):
+        data = json.dumps(
+            {'p': self.get_position(obj), 'r': int(reverse)},
+            # str() сохраняет микросекунды дат, DjangoJSONEncoder их режет
+            default=str,
+        )
+        cursor = urlsafe_b64encode(data.encode()).decode()
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, PageNumberPagination.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request, fields):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            data = json.loads(urlsafe_b64decode(encoded.encode()).decode())
+            values = list(data['p'])
+            if len(values) != len(self.ordering):
+                raise ValueError('число значений не совпадает с сортировкой')
+            # Курсор приходит от клиента: значения приводятся к типам
+            # полей, чтобы подделанный курсор не ломал запрос.
+            values = [
+                self.to_python(name, field, value)
+                for (name, _), field, value in zip(
+                    self.ordering, fields, values
+                )
+            ]
+            return values, bool(data['r'])
+        except (
+            BinasciiError, ValueError, TypeError, KeyError, ValidationError
+        ):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.page:
+            return None
+        if self.reverse or self.has_more:
+            return self.encode_cursor(self.page[-1], reverse=False)
+        return None
+
+    def get_previous_link(self):
+        if not self.page:
+            return None
+        if (self.reverse and self.has_more) or (
+            not self.reverse and self.has_cursor
+        ):
+            return self.encode_cursor(self.page[0], reverse=True)
+        return None
+
+
+class PageNumberOrKeysetPagination(PageNumberPagination):
+    """
+    Постраничная пагинация с переходом на keyset по запросу клиента.
+
+    По умолчанию ответ содержит count/next/previous/results.
+    Если в запросе есть параметр `cursor` (для первой страницы —
+    пустой), используется KeysetPagination без подсчёта записей.
+    """
+
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.keyset_class.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        self.keyset = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,159 @@
+"""
+Профилировщик SQL-запросов по эндпоинтам.
+
+QueryProfilerMiddleware (включается настройкой QUERY_PROFILER_ENABLED)
+считает запросы к БД и их суммарное время для каждого ответа, отдаёт их
+в заголовках X-Query-Count и X-Query-Time и накапливает сводку по имени
+URL: число вызовов, запросов, время и самые медленные запросы. Сводка
+хранится в памяти процесса.
+
+QUERY_BUDGETS задаёт лимит запросов для имени URL; при превышении
+пишется предупреждение в лог, а при QUERY_BUDGET_RAISE — выбрасывается
+QueryBudgetExceeded (удобно в тестах).
+
+Запросы пишет обёртка record_query, которая ставится на каждое новое
+соединение (см. api/signals.py), в QueryRecorder из контекстной
+переменной. Под ASGI представления обращаются к БД в потоке исполнителя
+asgiref, а контекст запроса переходит туда вместе с вызовом, поэтому
+запросы одновременных HTTP-запросов не смешиваются.
+"""
+import asyncio
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.utils.deprecation import MiddlewareMixin
+
+logger = logging.getLogger(__name__)
+
+SLOWEST_COUNT = 5
+
+_stats = {}
+_lock = threading.Lock()
+_recorder = ContextVar('query_recorder', default=None)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryRecorder:
+    """Обёртка execute_wrapper, запоминающая SQL и время запросов."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((time.perf_counter() - start, sql))
+
+    @property
+    def total_time(self):
+        return sum(duration for duration, _ in self.queries)
+
+
+def record_query(execute, sql, params, many, context):
+    """execute_wrapper соединения: передаёт запрос QueryRecorder запроса."""
+    recorder = _recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def record(view_name, recorder):
+    with _lock:
+        stats = _stats.setdefault(view_name, {
+            'requests': 0, 'queries': 0, 'max_queries': 0, 'time': 0.0,
+            'slowest': [],
+        })
+        stats['requests'] += 1
+        stats['queries'] += len(recorder.queries)
+        stats['max_queries'] = max(
+            stats['max_queries'], len(recorder.queries)
+        )
+        stats['time'] += recorder.total_time
+        stats['slowest'] = sorted(
+            stats['slowest'] + recorder.queries, reverse=True
+        )[:SLOWEST_COUNT]
+
+
+def get_stats():
+    """Сводка по эндпоинтам, время — в миллисекундах."""
+    with _lock:
+        return {
+            view_name: {
+                'requests': stats['requests'],
+                'queries': stats['queries'],
+                'avg_queries': round(stats['queries'] / stats['requests'], 2),
+                'max_queries': stats['max_queries'],
+                'time_ms': round(stats['time'] * 1000, 3),
+                'slowest': [
+                    {'time_ms': round(duration * 1000, 3), 'sql': sql}
+                    for duration, sql in stats['slowest']
+                ],
+            }
+            for view_name, stats in sorted(_stats.items())
+        }
+
+
+def reset_stats():
+    with _lock:
+        _stats.clear()
+
+
+def check_budget(view_name, count):
+    budget = settings.QUERY_BUDGETS.get(view_name)
+    if budget is None or count <= budget:
+        return
+    message = (
+        f'{view_name}: {count} SQL-запросов при лимите {budget}'
+    )
+    if settings.QUERY_BUDGET_RAISE:
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+class QueryProfilerMiddleware(MiddlewareMixin):
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        if not settings.QUERY_PROFILER_ENABLED:
+            return self.get_response(request)
+        recorder = QueryRecorder()
+        token = _recorder.set(recorder)
+        try:
+            response = self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        return self.report(request, response, recorder)
+
+    async def __acall__(self, request):
+        if not settings.QUERY_PROFILER_ENABLED:
+            return await self.get_response(request)
+        recorder = QueryRecorder()
+        token = _recorder.set(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        return self.report(request, response, recorder)
+
+    def report(self, request, response, recorder):
+        response['X-Query-Count'] = len(recorder.queries)
+        response['X-Query-Time'] = f'{recorder.total_time * 1000:.3f}'
+        match = request.resolver_match
+        if match is not None:
+            record(match.view_name, recorder)
+            check_budget(match.view_name, len(recorder.queries))
+        return response
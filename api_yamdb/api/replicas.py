@@ -0,0 +1,165 @@
+"""
+Чтение с реплик БД.
+
+ReplicaRouter отправляет чтение в запросах безопасными методами (GET,
+HEAD, OPTIONS) на одну из реплик из DATABASE_REPLICAS, а запись и
+чтение в остальных запросах — в основную БД. Реплика выбирается один
+раз на запрос настройкой DATABASE_REPLICA_STRATEGY: `round_robin` — по
+кругу, `least_recent` — та, к которой дольше всех не обращались (новая
+реплика в списке получает запросы сразу). Вне HTTP-запросов (команды,
+shell) роутер в выбор не вмешивается.
+
+Реплика может отставать, поэтому после успешного запроса с записью
+ReplicaMiddleware закрепляет пользователя за основной БД на
+DATABASE_REPLICA_STICKY_TIMEOUT секунд: он сразу видит свой отзыв или
+комментарий. Метка хранится в кеше DATABASE_REPLICA_CACHE_ALIAS, и при
+нескольких процессах он должен быть общим (Redis, Memcached).
+"""
+import asyncio
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.deprecation import MiddlewareMixin
+from rest_framework.permissions import SAFE_METHODS
+
+ROUND_ROBIN = 'round_robin'
+LEAST_RECENT = 'least_recent'
+
+
+@dataclass
+class Route:
+    """Маршрут чтения текущего запроса."""
+
+    primary: bool
+    alias: Optional[str] = None
+
+
+_route = ContextVar('replica_route', default=None)
+
+
+def get_cache():
+    return caches[settings.DATABASE_REPLICA_CACHE_ALIAS]
+
+
+def pin_key(user_id):
+    return f'replica:pin:{user_id}'
+
+
+def pin(user_id):
+    """Закрепляет пользователя за основной БД после записи."""
+    get_cache().set(
+        pin_key(user_id), True, settings.DATABASE_REPLICA_STICKY_TIMEOUT
+    )
+
+
+def route_user(user_id):
+    """
+    Переводит чтение текущего запроса в основную БД, если пользователь
+    недавно что-то записал. Вызывается аутентификацией.
+    """
+    route = _route.get()
+    if route is None or route.primary or not settings.DATABASE_REPLICAS:
+        return
+    if get_cache().get(pin_key(user_id)):
+        route.primary = True
+
+
+def is_write(request):
+    return request.method not in SAFE_METHODS
+
+
+def reads_from_replica():
+    """Читает ли текущий запрос (или прочитал уже) с реплики."""
+    route = _route.get()
+    return (
+        route is not None and not route.primary
+        and bool(settings.DATABASE_REPLICAS)
+    )
+
+
+class ReplicaRouter:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.turn = 0
+        self.last_used = {}
+
+    def choose(self, replicas):
+        with self.lock:
+            if settings.DATABASE_REPLICA_STRATEGY == LEAST_RECENT:
+                alias = min(
+                    replicas, key=lambda alias: self.last_used.get(alias, 0)
+                )
+            else:
+                alias = replicas[self.turn % len(replicas)]
+                self.turn += 1
+            self.last_used[alias] = time.monotonic()
+        return alias
+
+    def db_for_read(self, model, **hints):
+        route = _route.get()
+        if route is None or not settings.DATABASE_REPLICAS:
+            return None
+        if route.primary:
+            return DEFAULT_DB_ALIAS
+        if route.alias is None:
+            route.alias = self.choose(settings.DATABASE_REPLICAS)
+        return route.alias
+
+    def db_for_write(self, model, **hints):
+        # Объект, прочитанный с реплики, сохраняется в основную БД.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaMiddleware(MiddlewareMixin):
+    """Маршрут чтения на время запроса; работает и под ASGI."""
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        token = _route.set(Route(primary=is_write(request)))
+        try:
+            response = self.get_response(request)
+        finally:
+            _route.reset(token)
+        self.pin_author(request, response)
+        return response
+
+    async def __acall__(self, request):
+        token = _route.set(Route(primary=is_write(request)))
+        try:
+            response = await self.get_response(request)
+        finally:
+            _route.reset(token)
+        if is_write(request):
+            await sync_to_async(self.pin_author, thread_sensitive=True)(
+                request, response
+            )
+        return response
+
+    def pin_author(self, request, response):
+        user = getattr(request, 'user', None)
+        if (
+            is_write(request) and settings.DATABASE_REPLICAS
+            and response.status_code < 400
+            and user is not None and user.is_authenticated
+        ):
+            pin(user.pk)
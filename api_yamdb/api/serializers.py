@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
+from django.db.models import Q
 from django.forms import ValidationError
 from django.shortcuts import get_object_or_404
 from rest_framework import serializers
@@ -35,11 +36,15 @@ class TitleCreateUpdateSerializer(serializers.ModelSerializer):
         slug_field='slug'
     )
     rating = serializers.FloatField(read_only=True)
+    weighted_rating = serializers.FloatField(read_only=True)
+    reviews_count = serializers.IntegerField(
+        source='rating_count', read_only=True
+    )
 
     class Meta:
         model = Title
-        fields = ('id', 'name', 'year', 'rating',
-                  'description', 'genre', 'category')
+        fields = ('id', 'name', 'year', 'rating', 'weighted_rating',
+                  'reviews_count', 'description', 'genre', 'category')
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
@@ -66,31 +71,73 @@ class TitleSerializer(serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
 
     rating = serializers.FloatField()
+    weighted_rating = serializers.FloatField()
+    reviews_count = serializers.IntegerField(source='rating_count')
 
     class Meta:
         model = Title
-        fields = ('id', 'name', 'year', 'rating',
-                  'description', 'genre', 'category')
+        fields = ('id', 'name', 'year', 'rating', 'weighted_rating',
+                  'reviews_count', 'description', 'genre', 'category')
+
+
+class RatingHistogramSerializer(serializers.BaseSerializer):
+    """
+    Распределение оценок произведения из пары (title_id, histogram),
+    где histogram[i] — число оценок i + 1.
+    """
+
+    def to_representation(self, instance):
+        title_id, histogram = instance
+        count = sum(histogram)
+        return {
+            'title': title_id,
+            'count': count,
+            'mean': (
+                sum(score * n for score, n in enumerate(histogram, 1)) / count
+                if count else None
+            ),
+            'median': self.median(histogram, count),
+            'histogram': {
+                str(score): n for score, n in enumerate(histogram, 1)
+            },
+        }
+
+    @staticmethod
+    def median(histogram, count):
+        if not count:
+            return None
+        # Оценки на позициях (count - 1) // 2 и count // 2 по возрастанию.
+        middle = []
+        seen = 0
+        for score, n in enumerate(histogram, 1):
+            seen += n
+            while len(middle) < 2 and seen > (count - 1 + len(middle)) // 2:
+                middle.append(score)
+        return sum(middle) / 2
 
 
 class ReviewSerializer(serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True,
         slug_field='username')
+    # Аннотация with_comments_count(); у только что созданного отзыва
+    # комментариев нет.
+    comments_count = serializers.IntegerField(read_only=True, default=0)
 
     class Meta:
-        fields = 'id', 'text', 'author', 'score', 'pub_date'
+        fields = (
+            'id', 'text', 'author', 'score', 'pub_date', 'comments_count'
+        )
         model = Review
 
     def validate(self, data):
         request = self.context['request']
-        title_id = self.context['view'].kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-
         if (
             request.method == 'POST'
             and Review.objects.filter(
-                author=request.user, title=title).exists()
+                author_id=request.user.pk,
+                title=self.context['view'].get_parent(),
+            ).exists()
         ):
             raise ValidationError('Нельзя добавить 2 отзыв, только 1')
         return data
@@ -122,13 +169,24 @@ class BaseUserSerializer(serializers.ModelSerializer):
         fields = ('email', 'username')
 
     def validate(self, data):
+        """
+        Проверяет, что email и username свободны или принадлежат одному
+        пользователю.
+
+        Найденный пользователь сохраняется в self.existing_user, чтобы
+        представление не читало его из БД повторно.
+        """
         email = data.get('email')
         username = data.get('username')
 
-        user_with_email = User.objects.filter(email=email).exists()
-        user_with_username = User.objects.filter(username=username).exists()
-        user_email_first = User.objects.filter(email=email).first()
-        user_username_first = User.objects.filter(username=username).first()
+        users = User.objects.filter(Q(email=email) | Q(username=username))
+        user_email_first = user_username_first = None
+        for user in users[:2]:
+            if user.email == email:
+                user_email_first = user
+            if user.username == username:
+                user_username_first = user
+        self.existing_user = user_email_first
 
         errors = {}
         if user_email_first and user_username_first:
@@ -137,11 +195,11 @@ class BaseUserSerializer(serializers.ModelSerializer):
                 errors['username'] = 'Username принадлежит другому пол-лю.'
                 raise serializers.ValidationError(errors)
 
-        elif user_with_email and not user_with_username:
+        elif user_email_first:
             errors['email'] = 'Пользователь с таким email существует.'
             raise serializers.ValidationError(errors)
 
-        elif not user_with_email and user_with_username:
+        elif user_username_first:
             errors['username'] = 'Пользователь с таким username существует.'
             raise serializers.ValidationError(errors)
 
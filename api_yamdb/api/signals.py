@@ -0,0 +1,58 @@
+from django.core.signals import request_started
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_migrate, post_save
+)
+from django.dispatch import receiver
+
+from reviews.models import Category, CustomUser, Genre, Review, Title
+from . import authentication, cache, db_connections, profiler
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Review)
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_catalogue(sender, using='default', **kwargs):
+    # После коммита, чтобы параллельный запрос не закешировал
+    # данные, которые ещё не видны другим соединениям.
+    transaction.on_commit(cache.invalidate, using=using)
+
+
+@receiver(post_migrate)
+def invalidate_catalogue_after_migrate(sender, **kwargs):
+    cache.invalidate()
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_cached_user(sender, instance, using='default', **kwargs):
+    # После удаления Django обнуляет pk, поэтому id запоминаем сразу.
+    user_id = instance.pk
+    transaction.on_commit(
+        lambda: authentication.invalidate_user(user_id), using=using
+    )
+
+
+@receiver(request_started)
+def check_db_connections(sender, **kwargs):
+    # Подключается после close_old_connections из django.db, поэтому
+    # устаревшие соединения к этому моменту уже закрыты.
+    db_connections.count('requests')
+    db_connections.check_connections()
+
+
+@receiver(connection_created)
+def count_db_connection(sender, connection, **kwargs):
+    db_connections.count_connect(connection)
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    profiler.install(connection)
@@ -1,17 +1,25 @@
 from rest_framework import routers
-from django.urls import include, path
+from django.conf import settings
+from django.urls import URLPattern, include, path
 
 from .views import (
+    CatalogueCacheStatsView,
     CategoryViewSet,
     CommentViewSet,
     ConfirmRegistrationView,
+    ConnectionStatsView,
+    ExportView,
     GenreViewSet,
+    QueryStatsView,
     TitleViewSet,
     ReviewViewSet,
     UserRegistrationView,
     UserSelfView,
     UserViewSet
 )
+from .async_views import catalogue_view
+
+CATALOGUE_BASENAMES = ('categories', 'genres', 'titles')
 
 
 v1_router = routers.DefaultRouter()
@@ -32,6 +40,32 @@ v1_router.register(
 )
 v1_router.register(r'users', UserViewSet, basename='user')
 
+
+def is_catalogue_read(pattern):
+    basename, _, route = pattern.name.rpartition('-')
+    return (
+        basename in CATALOGUE_BASENAMES and route in ('list', 'detail')
+        and 'get' in pattern.callback.actions
+    )
+
+
+def async_catalogue(patterns):
+    """Заменяет списки и детали каталога асинхронными представлениями."""
+    return [
+        URLPattern(
+            pattern.pattern, catalogue_view(pattern.callback),
+            pattern.default_args, pattern.name,
+        )
+        if isinstance(pattern, URLPattern) and is_catalogue_read(pattern)
+        else pattern
+        for pattern in patterns
+    ]
+
+
+v1_urls = v1_router.urls
+if settings.CATALOGUE_ASYNC_VIEWS:
+    v1_urls = async_catalogue(v1_urls)
+
 urlpatterns = [
     path(
         'v1/auth/signup/', UserRegistrationView.as_view(),
@@ -43,5 +77,13 @@ urlpatterns = [
     ),
     path('v1/users/me/', UserSelfView.as_view(),
          name='user-self'),
-    path('v1/', include(v1_router.urls)),
+    path('v1/export/<str:table>/', ExportView.as_view(),
+         name='export'),
+    path('v1/_debug/cache/', CatalogueCacheStatsView.as_view(),
+         name='debug-cache'),
+    path('v1/_debug/queries/', QueryStatsView.as_view(),
+         name='debug-queries'),
+    path('v1/_debug/connections/', ConnectionStatsView.as_view(),
+         name='debug-connections'),
+    path('v1/', include(v1_urls)),
 ]
@@ -1,29 +1,38 @@
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db.models import Avg
-from django.forms import ValidationError
+from django.db import transaction
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, viewsets, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import AccessToken
 
-from .mixins import CreateListDeleteViewSet
-from .filters import TitleFilter
+from . import cache, db_connections, profiler
+from .mixins import (
+    CachedListMixin, ConditionalGetMixin, CreateListDeleteViewSet,
+    ParentObjectMixin
+)
+from .filters import TitleFilter, TitleOrderingFilter
 from .permissions import (
     IsAdminOrReadOnly, IsAuthorOrReadOnly, IsAdmin
 )
 from .serializers import (
     CategorySerializer, CommentSerializer, ConfirmRegistrationSerializer,
-    GenreSerializer, ReviewSerializer, TitleSerializer,
-    TitleCreateUpdateSerializer, UserRegistrationSerializer, UserSerializer,
-    UserUpdateSerializer
+    GenreSerializer, RatingHistogramSerializer, ReviewSerializer,
+    TitleSerializer, TitleCreateUpdateSerializer, UserRegistrationSerializer,
+    UserSerializer, UserUpdateSerializer
+)
+from reviews.export import CONTENT_TYPES, FORMATS, TABLES, iter_export
+from reviews.models import (
+    Category, Comment, Genre, RatingBucket, Review, Title
 )
-from reviews.models import Category, Genre, Review, Title
+from reviews.outbox import enqueue
 
 User = get_user_model()
 
@@ -44,12 +53,13 @@ class GenreViewSet(CreateListDeleteViewSet):
     serializer_class = GenreSerializer
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(ConditionalGetMixin, CachedListMixin,
+                   viewsets.ModelViewSet):
     """Получение произведения, частичное обновление, добавление и удаление."""
 
     http_method_names = ['get', 'post', 'patch', 'delete']
     permission_classes = (IsAdminOrReadOnly,)
-    filter_backends = (DjangoFilterBackend,)
+    filter_backends = (DjangoFilterBackend, TitleOrderingFilter)
     filterset_class = TitleFilter
 
     def get_serializer_class(self):
@@ -59,51 +69,107 @@ class TitleViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         return Title.objects.all().select_related('category').prefetch_related(
-            'genre').annotate(rating=Avg('reviews__score'))
+            'genre')
+
+    def get_revision_scopes(self):
+        # Отзыв меняет рейтинг своего произведения и список произведений,
+        # но не карточки других произведений.
+        if self.detail:
+            return ('catalogue', f'title:{self.kwargs.get("pk")}')
+        return ('catalogue', 'titles')
+
+    @action(detail=True)
+    def rating(self, request, pk=None):
+        """Распределение оценок произведения."""
+        title = get_object_or_404(Title.objects.only('pk'), pk=pk)
+        histograms = RatingBucket.objects.histograms([title.pk])
+        return Response(
+            RatingHistogramSerializer(histograms.popitem()).data
+        )
+
+    @action(detail=False, url_path='rating')
+    def ratings(self, request):
+        """Распределения оценок нескольких произведений: ?ids=1,2,3."""
+        ids = request.query_params.get('ids', '')
+        try:
+            ids = [int(pk) for pk in ids.split(',')]
+        except ValueError:
+            raise ValidationError(
+                {'ids': ['Укажите id произведений через запятую.']}
+            )
+        if len(ids) > self.paginator.page_size:
+            raise ValidationError(
+                {'ids': [f'Не больше {self.paginator.page_size} id.']}
+            )
+        existing = Title.objects.filter(pk__in=ids).values_list(
+            'pk', flat=True)
+        histograms = RatingBucket.objects.histograms(sorted(existing))
+        return Response(RatingHistogramSerializer(
+            histograms.items(), many=True
+        ).data)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalGetMixin, ParentObjectMixin,
+                    viewsets.ModelViewSet):
     """Получение обзора, частичное обновление, добавление и удаление."""
 
     serializer_class = ReviewSerializer
     permission_classes = (IsAuthorOrReadOnly,)
     http_method_names = ['get', 'post', 'patch', 'delete', 'head', 'options']
+    parent_model = Title
+
+    def get_revision_scopes(self):
+        return (f'title:{self.kwargs.get("title_id")}:reviews', 'authors')
 
-    def get_title(self):
-        return get_object_or_404(
-            Title, id=self.kwargs.get('title_id'))
+    def get_parent_filter(self):
+        return {'pk': self.kwargs.get('title_id')}
 
     def get_queryset(self):
-        title = self.get_title()
-        return title.reviews.all()
+        return Review.objects.filter(
+            title_id=self.kwargs.get('title_id')
+        ).select_related('author').with_comments_count()
 
+    # Рейтинг и гистограмму оценок произведения обновляют сигналы отзыва
+    # в той же транзакции.
+    @transaction.atomic
     def perform_create(self, serializer):
-        title = self.get_title()
-        serializer.save(author=self.request.user, title=title)
+        serializer.save(
+            author_id=self.request.user.pk, title=self.get_parent()
+        )
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        serializer.save()
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalGetMixin, ParentObjectMixin,
+                     viewsets.ModelViewSet):
     """Получение комментариев, частичное обновление, добавление и удаление."""
 
     serializer_class = CommentSerializer
     permission_classes = (IsAuthorOrReadOnly,)
     http_method_names = ['get', 'post', 'patch', 'delete', 'head', 'options']
+    parent_model = Review
 
-    def get_review(self):
-        title_id = self.kwargs.get('title_id')
-        review_id = self.kwargs.get('review_id')
-        return get_object_or_404(
-            Review.objects.filter(title_id=title_id),
-            id=review_id,
-        )
+    def get_revision_scopes(self):
+        return (f'review:{self.kwargs.get("review_id")}:comments', 'authors')
+
+    def get_parent_filter(self):
+        return {
+            'pk': self.kwargs.get('review_id'),
+            'title_id': self.kwargs.get('title_id'),
+        }
 
     def get_queryset(self):
-        review = self.get_review()
-        return review.comments.all()
+        return Comment.objects.filter(
+            review_id=self.kwargs.get('review_id'),
+            review__title_id=self.kwargs.get('title_id'),
+        ).select_related('author')
 
     def perform_create(self, serializer):
-        review = self.get_review()
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(
+            author_id=self.request.user.pk, review=self.get_parent()
+        )
 
 
 class UserRegistrationView(APIView):
@@ -113,7 +179,7 @@ class UserRegistrationView(APIView):
     Доступно для всех пользователей (без аутентификации).
     Принимает POST-запрос с полями email и username
     для регистрации нового пользователя.
-    Отправляет код подтверждения на указанный email.
+    Ставит в очередь письмо с кодом подтверждения на указанный email.
     """
 
     permission_classes = (AllowAny,)
@@ -131,24 +197,20 @@ class UserRegistrationView(APIView):
             errors = {k: v for k, v in errors.items() if v}
             return Response(errors, status=status.HTTP_400_BAD_REQUEST)
 
-        email = serializer.validated_data['email']
-        username = serializer.validated_data['username']
-
-        user = User.objects.filter(email=email).first()
-        if user:
-            confirmation_code = default_token_generator.make_token(user)
-        else:
-            user = User.objects.create_user(username=username, email=email)
-            user.is_active = False
-            user.save()
-            confirmation_code = default_token_generator.make_token(user)
+        user = serializer.existing_user
+        if user is None:
+            user = User.objects.create_user(
+                username=serializer.validated_data['username'],
+                email=serializer.validated_data['email'],
+                is_active=False,
+            )
+        confirmation_code = default_token_generator.make_token(user)
 
-        send_mail(
+        enqueue(
             'Подтверждение регистрации',
             f'Ваш код подтверждения: {confirmation_code}',
-            settings.DEFAULT_FROM_EMAIL,
             [user.email],
-            fail_silently=False,
+            settings.DEFAULT_FROM_EMAIL,
         )
 
         response_serializer = self.serializer_class(user)
@@ -193,7 +255,7 @@ class ConfirmRegistrationView(APIView):
             )
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     Вьюсет для управления пользователями.
 
@@ -210,9 +272,10 @@ class UserViewSet(viewsets.ModelViewSet):
     lookup_field = 'username'
     filter_backends = (filters.SearchFilter,)
     search_fields = ['username', 'email', 'first_name', 'last_name']
+    revision_scopes = ('users',)
 
 
-class UserSelfView(APIView):
+class UserSelfView(ConditionalGetMixin, APIView):
     """
     Представление для получения и частичного обновления данных
     текущего пользователя.
@@ -222,14 +285,97 @@ class UserSelfView(APIView):
 
     permission_classes = (IsAuthenticated,)
 
+    def get_revision_scopes(self):
+        return (f'user:{self.request.user.pk}',)
+
+    def get_object(self):
+        # request.user — кешированная проекция, полная запись только в БД.
+        return get_object_or_404(User, pk=self.request.user.pk)
+
     def get(self, request):
-        serializer = UserSerializer(request.user)
+        serializer = UserSerializer(self.get_object())
         return Response(serializer.data)
 
     def patch(self, request):
         serializer = UserUpdateSerializer(
-            request.user, data=request.data, partial=True)
+            self.get_object(), data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ExportView(APIView):
+    """
+    Потоковая выгрузка таблицы в CSV или NDJSON.
+
+    Доступно только администраторам. Колонки совпадают с файлами
+    static/data/, формат задаётся параметром file_format (csv или ndjson).
+    """
+
+    permission_classes = (IsAuthenticated, IsAdmin)
+
+    def get(self, request, table):
+        file_format = request.query_params.get('file_format', 'csv')
+        if table not in TABLES:
+            raise NotFound(f'Таблица {table} не найдена.')
+        if file_format not in FORMATS:
+            return Response(
+                {'file_format': [f'Допустимые форматы: {", ".join(FORMATS)}']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        response = StreamingHttpResponse(
+            iter_export(table, file_format),
+            content_type=CONTENT_TYPES[file_format],
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{table}.{file_format}"'
+        )
+        return response
+
+
+class CatalogueCacheStatsView(APIView):
+    """Счётчики попаданий и промахов кеша каталога (для администратора)."""
+
+    permission_classes = (IsAuthenticated, IsAdmin)
+
+    def get(self, request):
+        return Response(cache.get_stats())
+
+
+class QueryStatsView(APIView):
+    """
+    Сводка SQL-запросов по эндпоинтам (для администратора).
+
+    DELETE сбрасывает накопленную статистику.
+    """
+
+    permission_classes = (IsAuthenticated, IsAdmin)
+
+    def get(self, request):
+        return Response({
+            'enabled': settings.QUERY_PROFILER_ENABLED,
+            'endpoints': profiler.get_stats(),
+        })
+
+    def delete(self, request):
+        profiler.reset_stats()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ConnectionStatsView(APIView):
+    """
+    Оборот соединений с БД в процессе, ответившем на запрос
+    (для администратора).
+
+    DELETE сбрасывает счётчики.
+    """
+
+    permission_classes = (IsAuthenticated, IsAdmin)
+
+    def get(self, request):
+        return Response(db_connections.get_stats())
+
+    def delete(self, request):
+        db_connections.reset_stats()
+        return Response(status=status.HTTP_204_NO_CONTENT)
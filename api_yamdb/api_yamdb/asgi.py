@@ -12,5 +12,9 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+# Под ASGI соединения с PostgreSQL берутся из пула процесса, а не
+# закрепляются за потоками исполнителя (api_yamdb/backends/pool.py).
+# Отключается переменной окружения DB_POOL=False.
+os.environ.setdefault('DB_POOL', 'True')
 
 application = get_asgi_application()
@@ -0,0 +1,114 @@
+"""
+Лёгкий пул соединений с БД для ASGI.
+
+Django держит соединение в том потоке, который его открыл. Под ASGI код
+выполняется в потоках исполнителя asgiref, поэтому постоянные
+соединения (CONN_MAX_AGE) привязываются к случайным потокам и их число
+ничем не ограничено. PooledDatabaseWrapperMixin отвязывает соединение от
+потока: close() возвращает исправное соединение в общий для процесса
+пул, а следующее подключение из любого потока берёт его оттуда,
+проверив запросом `SELECT 1`. Пул хранит не больше DB_POOL_SIZE
+свободных соединений на алиас БД, лишние закрываются.
+"""
+import queue
+import threading
+from collections import Counter
+from contextlib import closing
+
+from django.conf import settings
+
+_pools = {}
+_stats = Counter()
+_lock = threading.Lock()
+
+
+def get_pool(alias):
+    with _lock:
+        if alias not in _pools:
+            # LIFO: в работе остаются недавно использованные соединения.
+            _pools[alias] = queue.LifoQueue(maxsize=settings.DB_POOL_SIZE)
+        return _pools[alias]
+
+
+def count(name):
+    with _lock:
+        _stats[name] += 1
+
+
+def get_stats():
+    """Свободные соединения по алиасам и счётчики пула процесса."""
+    with _lock:
+        return {
+            'size': settings.DB_POOL_SIZE,
+            'idle': {alias: pool.qsize() for alias, pool in _pools.items()},
+            'created': _stats['created'],
+            'reused': _stats['reused'],
+            'returned': _stats['returned'],
+            'discarded': _stats['discarded'],
+        }
+
+
+def clear():
+    """Закрывает свободные соединения и сбрасывает счётчики."""
+    with _lock:
+        pools = list(_pools.values())
+        _pools.clear()
+        _stats.clear()
+    for pool in pools:
+        while not pool.empty():
+            pool.get_nowait().close()
+
+
+class PooledDatabaseWrapperMixin:
+    """Примесь к DatabaseWrapper бэкенда, см. описание модуля."""
+
+    # Взято ли текущее соединение из пула, а не открыто заново; по нему
+    # api.db_connections отличает выдачу из пула от подключения к БД.
+    from_pool = False
+
+    def get_new_connection(self, conn_params):
+        pool = get_pool(self.alias)
+        self.from_pool = False
+        while True:
+            try:
+                connection = pool.get_nowait()
+            except queue.Empty:
+                break
+            if self.ping(connection):
+                count('reused')
+                self.from_pool = True
+                return connection
+            count('discarded')
+            try:
+                connection.close()
+            except self.Database.Error:
+                pass
+        count('created')
+        return super().get_new_connection(conn_params)
+
+    def ping(self, connection):
+        try:
+            with closing(connection.cursor()) as cursor:
+                cursor.execute('SELECT 1')
+        except self.Database.Error:
+            return False
+        return True
+
+    def _close(self):
+        # Соединение с незавершённой транзакцией, ошибкой или изменённым
+        # режимом autocommit в пул не возвращается.
+        reusable = (
+            self.connection is not None
+            and not self.in_atomic_block
+            and not self.errors_occurred
+            and self.autocommit == self.settings_dict['AUTOCOMMIT']
+        )
+        if reusable:
+            try:
+                get_pool(self.alias).put_nowait(self.connection)
+            except queue.Full:
+                count('discarded')
+            else:
+                count('returned')
+                return
+        super()._close()
@@ -43,8 +43,10 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'api.replicas.ReplicaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.profiler.QueryProfilerMiddleware',
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
@@ -75,9 +77,101 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Сколько секунд соединение живёт между запросами;
+        # 0 — закрывать после каждого запроса.
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
     }
 }
 
+# PRAGMA для каждого нового соединения с SQLite. WAL позволяет читать во
+# время записи, busy_timeout (мс) — ждать блокировку вместо ошибки
+# "database is locked"; отрицательный cache_size задаётся в КиБ.
+# Пустой словарь оставляет настройки SQLite по умолчанию.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -20000,
+    'mmap_size': 128 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+# Реплики только для чтения: пути к копиям БД SQLite через запятую в
+# DB_REPLICAS (для PostgreSQL алиасы добавляются в DATABASES так же).
+# GET-запросы читают с реплик, запись идёт в default; см. api/replicas.py.
+DATABASE_REPLICAS = []
+for number, name in enumerate(
+    filter(None, os.getenv('DB_REPLICAS', '').split(',')), 1
+):
+    DATABASES[f'replica{number}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': name,
+        'CONN_MAX_AGE': DATABASES['default']['CONN_MAX_AGE'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['api.replicas.ReplicaRouter']
+# round_robin или least_recent.
+DATABASE_REPLICA_STRATEGY = os.getenv('DB_REPLICA_STRATEGY', 'round_robin')
+# Сколько секунд после записи пользователь читает из основной БД.
+DATABASE_REPLICA_STICKY_TIMEOUT = 10
+DATABASE_REPLICA_CACHE_ALIAS = 'default'
+
+# Проверять постоянное соединение перед повторным использованием в
+# новом запросе (в Django 3.2 нет CONN_HEALTH_CHECKS).
+DB_CONN_HEALTH_CHECKS = os.getenv('DB_CONN_HEALTH_CHECKS', 'True') == 'True'
+
+# Пул соединений процесса для PostgreSQL; включается в asgi.py.
+# DB_POOL_SIZE — сколько свободных соединений хранить на алиас БД.
+DB_POOL = os.getenv('DB_POOL', 'False') == 'True'
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+POOLED_ENGINES = {
+    'django.db.backends.postgresql': 'api_yamdb.backends.postgresql',
+}
+if DB_POOL:
+    for database in DATABASES.values():
+        if database['ENGINE'] in POOLED_ENGINES:
+            database['ENGINE'] = POOLED_ENGINES[database['ENGINE']]
+            # В конце запроса соединение возвращается в пул.
+            database['CONN_MAX_AGE'] = 0
+
+
+# Cache
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Кеш ответов каталога: алиас из CACHES и время жизни записи в секундах.
+CATALOGUE_CACHE_ALIAS = 'default'
+CATALOGUE_CACHE_TIMEOUT = 60 * 5
+# Асинхронные представления чтения каталога (api/async_views.py);
+# включаются в asgi.py.
+CATALOGUE_ASYNC_VIEWS = os.getenv('CATALOGUE_ASYNC_VIEWS', 'False') == 'True'
+
+# Кеш проекции пользователя для JWT-аутентификации.
+AUTH_USER_CACHE_ALIAS = 'default'
+AUTH_USER_CACHE_TIMEOUT = 60
+
+
+# Байесовский рейтинг произведения: к отзывам добавляется RATING_PRIOR_WEIGHT
+# воображаемых оценок RATING_PRIOR_MEAN (вес должен быть больше нуля).
+# Текущую среднюю оценку по каталогу выводит команда recalculate_ratings.
+RATING_PRIOR_MEAN = 7.0
+RATING_PRIOR_WEIGHT = 5
+
+
+# Профилировщик SQL-запросов: заголовки X-Query-Count/X-Query-Time и сводка
+# /api/v1/_debug/queries/. QUERY_BUDGETS — лимиты запросов по имени URL
+# (например, 'titles-list'); при превышении пишется предупреждение,
+# а при QUERY_BUDGET_RAISE выбрасывается исключение.
+QUERY_PROFILER_ENABLED = DEBUG
+QUERY_BUDGETS = {}
+QUERY_BUDGET_RAISE = False
+
 
 # Password validation
 
@@ -131,12 +225,32 @@ EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 # EMAIL_HOST_PASSWORD =
 # DEFAULT_FROM_EMAIL =
 
+# Письма регистрации сначала записываются в очередь (reviews.OutboxEmail),
+# а отправляются командой send_outbox одним SMTP-соединением на пачку.
+# None (по умолчанию) — отправлять сразу после коммита только через
+# локальные бэкенды из EMAIL_OUTBOX_EAGER_BACKENDS, которые в сеть не ходят;
+# с SMTP и любым другим бэкендом письма ждут
+# `python manage.py send_outbox --loop`. Переменная окружения
+# EMAIL_OUTBOX_EAGER=True/False задаёт поведение явно.
+EMAIL_OUTBOX_EAGER = {'True': True, 'False': False}.get(
+    os.getenv('EMAIL_OUTBOX_EAGER')
+)
+EMAIL_OUTBOX_EAGER_BACKENDS = (
+    'django.core.mail.backends.console.EmailBackend',
+    'django.core.mail.backends.locmem.EmailBackend',
+    'django.core.mail.backends.filebased.EmailBackend',
+)
+# Сколько раз пытаться отправить письмо и пауза перед первым повтором
+# в секундах (каждая следующая пауза вдвое длиннее).
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 60
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_FILTER_BACKENDS': ('django_filters.rest_framework.DjangoFilterBackend',),
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.PageNumberOrKeysetPagination',
     'PAGE_SIZE': 10,
 }
 
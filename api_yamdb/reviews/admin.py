@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.contrib.auth import get_user_model
 from django.contrib.auth.admin import UserAdmin as UAdmin
 
-from .models import Category, Comment, Genre, Review, Title
+from .models import Category, Comment, Genre, OutboxEmail, Review, Title
 
 User = get_user_model()
 
@@ -97,3 +97,16 @@ class UserAdmin(UAdmin):
     )
     search_fields = ('username', 'role',)
     list_filter = ('username',)
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        'subject',
+        'to',
+        'created',
+        'attempts',
+        'sent_at',
+    )
+    search_fields = ('subject',)
+    list_filter = ('sent_at',)
@@ -6,3 +6,6 @@ class ReviewsConfig(AppConfig):
     name = 'reviews'
 
     verbose_name = 'Отзывы на произведения'
+
+    def ready(self):
+        from . import signals  # noqa: F401
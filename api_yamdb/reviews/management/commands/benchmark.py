@@ -0,0 +1,251 @@
+import json
+import math
+import time
+from pathlib import Path
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, Q
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import NoReverseMatch, URLResolver, get_resolver, reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.models import CustomUser, Review, Title
+
+# Метки эндпоинтов в отчёте; для остальных метка — имя URL. Сохранены
+# метки прежних прогонов, чтобы --compare работал со старыми JSON.
+LABELS = {
+    'categories-list': 'categories',
+    'genres-list': 'genres',
+    'titles-list': 'titles',
+    'titles-detail': 'title',
+    'reviews-list': 'reviews',
+    'reviews-detail': 'review',
+    'comments-list': 'comments',
+    'comments-detail': 'comment',
+    'user-list': 'users',
+    'user-detail': 'user',
+    'user-self': 'me',
+}
+# Дополнительные прогоны: метка, имя URL и параметры строки запроса.
+VARIANTS = (
+    ('titles-last-page', 'titles-list', {'page': 'last'}),
+    ('titles-cursor', 'titles-list', {'cursor': ''}),
+    ('titles-search', 'titles-list', {'q': 'город'}),
+)
+THRESHOLD = 20
+
+
+def iter_patterns(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_patterns(pattern.url_patterns)
+        else:
+            yield pattern
+
+
+def allows_get(callback):
+    actions = getattr(callback, 'actions', None)
+    if actions is not None:
+        return 'get' in actions
+    view_class = getattr(callback, 'cls', None)
+    return view_class is None or hasattr(view_class, 'get')
+
+
+def get_endpoints():
+    """
+    Именованные GET-эндпоинты api/urls.py и варианты из VARIANTS:
+    (метка, имя URL, параметры строки запроса).
+    """
+    names = []
+    for pattern in iter_patterns(get_resolver('api.urls').url_patterns):
+        # Шаблоны с суффиксом формата повторяют имя основного.
+        if pattern.name and pattern.name not in names and allows_get(
+            pattern.callback
+        ):
+            names.append(pattern.name)
+    endpoints = [(LABELS.get(name, name), name, {}) for name in names]
+    return endpoints + list(VARIANTS)
+
+
+def percentile(values, percent):
+    """Процентиль методом ближайшего ранга."""
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def compare(baseline, current, threshold):
+    """
+    Сравнивает два прогона и возвращает строки отчёта и список
+    регрессий: рост p95 больше threshold процентов или рост числа
+    запросов.
+    """
+    lines, regressions = [], []
+    for label, result in current['endpoints'].items():
+        before = baseline['endpoints'].get(label)
+        if before is None:
+            lines.append(f'{label}: нет в базовом прогоне')
+            continue
+        change = (
+            (result['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100
+            if before['p95_ms'] else 0
+        )
+        lines.append(
+            f'{label}: p95 {before["p95_ms"]} -> {result["p95_ms"]} мс '
+            f'({change:+.0f}%), запросов {before["queries"]} -> '
+            f'{result["queries"]}'
+        )
+        if change > threshold:
+            regressions.append(f'{label}: p95 вырос на {change:.0f}%')
+        if result['queries'] > before['queries']:
+            regressions.append(
+                f'{label}: запросов {before["queries"]} -> '
+                f'{result["queries"]}'
+            )
+    return lines, regressions
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогоняет GET-запросы ко всем эндпоинтам API через тестовый '
+        'клиент и сохраняет p50/p95 времени ответа и число SQL-запросов '
+        'в JSON. С --compare сравнивает результат с прошлым прогоном.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=20,
+            help='Сколько раз запрашивать каждый эндпоинт.',
+        )
+        parser.add_argument(
+            '--username',
+            help='Администратор, от имени которого идут запросы.',
+        )
+        parser.add_argument('--output', type=Path, help='Куда записать JSON.')
+        parser.add_argument(
+            '--load', type=Path,
+            help='Не запускать прогон, а взять результат из файла.',
+        )
+        parser.add_argument(
+            '--compare', type=Path,
+            help='Базовый прогон для сравнения.',
+        )
+        parser.add_argument(
+            '--threshold', type=float, default=THRESHOLD,
+            help='Допустимый рост p95 в процентах.',
+        )
+
+    def handle(self, *args, **options):
+        if options['load']:
+            result = json.loads(options['load'].read_text(encoding='utf-8'))
+        else:
+            result = self.run(options['requests'], options['username'])
+        if options['output']:
+            options['output'].write_text(
+                json.dumps(result, ensure_ascii=False, indent=2),
+                encoding='utf-8',
+            )
+        for label, stats in result['endpoints'].items():
+            self.stdout.write(
+                f'{label}: {stats["status"]}, p50 {stats["p50_ms"]} мс, '
+                f'p95 {stats["p95_ms"]} мс, запросов {stats["queries"]}'
+            )
+        if not options['compare']:
+            return
+        baseline = json.loads(
+            options['compare'].read_text(encoding='utf-8')
+        )
+        lines, regressions = compare(
+            baseline, result, options['threshold']
+        )
+        self.stdout.write('\n'.join(lines))
+        if regressions:
+            raise CommandError(
+                'Регрессии производительности:\n' + '\n'.join(regressions)
+            )
+        self.stdout.write(self.style.SUCCESS('Регрессий нет'))
+
+    def get_admin(self, username):
+        admins = CustomUser.objects.filter(
+            Q(role=CustomUser.ADMIN) | Q(is_superuser=True)
+        )
+        if username:
+            admins = admins.filter(username=username)
+        admin = admins.order_by('pk').first()
+        if admin is None:
+            raise CommandError('Не найден администратор для запросов.')
+        return admin
+
+    def get_arguments(self, admin):
+        """
+        Параметры URL и строки запроса по именам URL: самое популярное
+        произведение и его отзыв.
+        """
+        title = Title.objects.order_by('-rating_count', 'pk').first()
+        review = title and Review.objects.filter(title=title).annotate(
+            comments_count=Count('comments')
+        ).order_by('-comments_count', 'pk').first()
+        if review is None:
+            raise CommandError(
+                'Нет отзывов: сначала выполните generate_fake_data.'
+            )
+        comment = review.comments.order_by('pk').first()
+        kwargs = {
+            'titles-detail': {'pk': title.pk},
+            'titles-rating': {'pk': title.pk},
+            'reviews-list': {'title_id': title.pk},
+            'reviews-detail': {'title_id': title.pk, 'pk': review.pk},
+            'comments-list': {'title_id': title.pk, 'review_id': review.pk},
+            'comments-detail': {
+                'title_id': title.pk, 'review_id': review.pk,
+                'pk': comment.pk if comment else 0,
+            },
+            'user-detail': {'username': admin.username},
+            'export': {'table': 'genre'},
+        }
+        params = {'titles-ratings': {'ids': str(title.pk)}}
+        return kwargs, params
+
+    def run(self, requests, username):
+        admin = self.get_admin(username)
+        kwargs, default_params = self.get_arguments(admin)
+        client = Client(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(admin)}'
+        )
+        endpoints = {}
+        for label, name, params in get_endpoints():
+            try:
+                url = reverse(name, kwargs=kwargs.get(name))
+            except NoReverseMatch:
+                raise CommandError(
+                    f'Нет параметров URL для эндпоинта {name}: добавьте их '
+                    'в get_arguments().'
+                )
+            params = params or default_params.get(name, {})
+            timings, queries = [], 0
+            for _ in range(requests):
+                with CaptureQueriesContext(connection) as context:
+                    started = time.perf_counter()
+                    response = client.get(url, params)
+                    if response.streaming:
+                        b''.join(response.streaming_content)
+                    timings.append(time.perf_counter() - started)
+                queries = max(queries, len(context))
+            endpoints[label] = {
+                'url': url,
+                'params': params,
+                'status': response.status_code,
+                'p50_ms': round(percentile(timings, 50) * 1000, 3),
+                'p95_ms': round(percentile(timings, 95) * 1000, 3),
+                'queries': queries,
+            }
+        return {
+            'created': timezone.now().isoformat(),
+            'requests': requests,
+            'titles': Title.objects.count(),
+            'reviews': Review.objects.count(),
+            'endpoints': endpoints,
+        }
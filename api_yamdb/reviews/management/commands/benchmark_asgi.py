@@ -0,0 +1,169 @@
+import asyncio
+import importlib
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import override_settings
+from django.urls import clear_url_caches, reverse
+
+from reviews.models import Title
+from .benchmark import percentile
+
+PATHS = {'sync': False, 'async': True}
+
+
+@contextmanager
+def catalogue_views(async_views):
+    """URLconf с синхронными или асинхронными представлениями каталога."""
+
+    def reload_urls():
+        # api.urls выбирает представления при импорте по настройке.
+        importlib.reload(importlib.import_module('api.urls'))
+        importlib.reload(importlib.import_module(settings.ROOT_URLCONF))
+        clear_url_caches()
+
+    try:
+        with override_settings(CATALOGUE_ASYNC_VIEWS=async_views):
+            reload_urls()
+            yield
+    finally:
+        reload_urls()
+
+
+async def get(application, url, query_string=''):
+    """GET-запрос к ASGI-приложению в том же процессе; возвращает статус."""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': url,
+        'raw_path': url.encode(),
+        'query_string': query_string.encode(),
+        'root_path': '',
+        'headers': [(b'host', b'localhost')],
+        'client': ('127.0.0.1', 0),
+        'server': ('localhost', 80),
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await application(scope, receive, send)
+    return messages[0]['status']
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест чтения каталога через ASGI: много одновременных '
+        'клиентов запрашивают списки категорий, жанров, произведений и '
+        'самое популярное произведение. Сравнивает запросы в секунду и '
+        'p99 синхронных и асинхронных представлений каталога. С '
+        '--unique-urls у каждого запроса свой URL: одновременные '
+        'одинаковые запросы не объединяются и не берутся из кеша.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--clients', type=int, default=50,
+            help='Число одновременных клиентов.',
+        )
+        parser.add_argument(
+            '--requests', type=int, default=20,
+            help='Сколько запросов делает каждый клиент.',
+        )
+        parser.add_argument(
+            '--path', choices=(*PATHS, 'both'), default='both',
+        )
+        parser.add_argument(
+            '--unique-urls', action='store_true',
+            help='Добавлять к каждому URL уникальный параметр запроса.',
+        )
+        parser.add_argument('--output', type=Path, help='Куда записать JSON.')
+
+    def handle(self, *args, **options):
+        title = Title.objects.order_by('-rating_count', 'pk').first()
+        if title is None:
+            raise CommandError(
+                'Нет произведений: сначала выполните generate_fake_data.'
+            )
+        paths = PATHS if options['path'] == 'both' else {
+            options['path']: PATHS[options['path']]
+        }
+        results = {}
+        for name, async_views in paths.items():
+            with catalogue_views(async_views):
+                urls = [
+                    reverse('categories-list'),
+                    reverse('genres-list'),
+                    reverse('titles-list'),
+                    reverse('titles-detail', kwargs={'pk': title.pk}),
+                ]
+                results[name] = asyncio.run(self.run(
+                    urls, options['clients'], options['requests'],
+                    options['unique_urls'],
+                ))
+            self.report(name, results[name])
+        if {'sync', 'async'} <= results.keys():
+            sync, async_ = results['sync'], results['async']
+            self.stdout.write(
+                f'async/sync: запросов в секунду '
+                f'×{async_["rps"] / sync["rps"]:.2f}, '
+                f'p99 {sync["p99_ms"]} -> {async_["p99_ms"]} мс'
+            )
+        if options['output']:
+            options['output'].write_text(
+                json.dumps(results, ensure_ascii=False, indent=2),
+                encoding='utf-8',
+            )
+
+    def report(self, name, result):
+        self.stdout.write(
+            f'{name}: {result["rps"]} запросов/с, '
+            f'p50 {result["p50_ms"]} мс, p99 {result["p99_ms"]} мс, '
+            f'ошибок {result["errors"]}'
+        )
+
+    async def run(self, urls, clients, requests, unique_urls=False):
+        application = get_asgi_application()
+        timings, errors = [], 0
+
+        async def client(number):
+            nonlocal errors
+            for index in range(requests):
+                url = urls[(number + index) % len(urls)]
+                # Фильтры и пагинация неизвестный параметр не учитывают.
+                query_string = (
+                    f'request={number}-{index}' if unique_urls else ''
+                )
+                started = time.perf_counter()
+                status = await get(application, url, query_string)
+                timings.append(time.perf_counter() - started)
+                if status != 200:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client(number) for number in range(clients)))
+        elapsed = time.perf_counter() - started
+        await sync_to_async(connections.close_all, thread_sensitive=True)()
+        return {
+            'clients': clients,
+            'unique_urls': unique_urls,
+            'requests': len(timings),
+            'rps': round(len(timings) / elapsed, 1),
+            'p50_ms': round(percentile(timings, 50) * 1000, 3),
+            'p99_ms': round(percentile(timings, 99) * 1000, 3),
+            'errors': errors,
+        }
@@ -0,0 +1,170 @@
+import json
+import threading
+import time
+from collections import Counter
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError, call_command
+from django.db import connection, connections
+from django.test import Client
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.models import CustomUser, Review, Title
+from .benchmark import percentile
+
+# Профиль SQLite по умолчанию: журнал отката и ожидание блокировки 5 с,
+# как у драйвера sqlite3 без настроек.
+DEFAULT_PRAGMAS = {'journal_mode': 'DELETE', 'synchronous': 'FULL'}
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет пропускную способность чтения списка отзывов, пока '
+        'другие потоки публикуют отзывы через API, с настройками SQLite '
+        'по умолчанию и с SQLITE_PRAGMAS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument(
+            '--duration', type=float, default=5,
+            help='Длительность каждого прогона в секундах.',
+        )
+        parser.add_argument(
+            '--profile', choices=('default', 'tuned', 'both'),
+            default='both',
+        )
+        parser.add_argument('--output', type=Path, help='Куда записать JSON.')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Команда сравнивает настройки SQLite.')
+        profiles = {
+            'default': DEFAULT_PRAGMAS,
+            'tuned': settings.SQLITE_PRAGMAS,
+        }
+        if options['profile'] != 'both':
+            profiles = {options['profile']: profiles[options['profile']]}
+        tuned_pragmas = settings.SQLITE_PRAGMAS
+        results = {}
+        try:
+            for name, pragmas in profiles.items():
+                settings.SQLITE_PRAGMAS = pragmas
+                connections.close_all()
+                results[name] = self.run(
+                    options['readers'], options['writers'],
+                    options['duration'],
+                )
+                self.report(name, results[name])
+        finally:
+            settings.SQLITE_PRAGMAS = tuned_pragmas
+            connections.close_all()
+        if options['output']:
+            options['output'].write_text(
+                json.dumps(results, ensure_ascii=False, indent=2),
+                encoding='utf-8',
+            )
+
+    def report(self, name, result):
+        self.stdout.write(
+            f'{name}: чтений {result["reads_per_second"]}/с '
+            f'(p50 {result["read_p50_ms"]} мс, '
+            f'p95 {result["read_p95_ms"]} мс), '
+            f'записей {result["writes_per_second"]}/с, '
+            f'ошибок {result["errors"]}'
+        )
+
+    def get_targets(self, writers):
+        title = Title.objects.order_by('-rating_count', 'pk').first()
+        titles = list(Title.objects.order_by('pk').values_list(
+            'pk', flat=True))
+        users = list(CustomUser.objects.filter(
+            role=CustomUser.USER, is_active=True
+        ).order_by('pk')[:writers])
+        if title is None or len(users) < writers:
+            raise CommandError(
+                'Недостаточно данных: сначала выполните generate_fake_data.'
+            )
+        return title.pk, titles, users
+
+    def read(self, url, stop, lock, timings, stats):
+        client = Client(raise_request_exception=False)
+        try:
+            while not stop.is_set():
+                started = time.perf_counter()
+                response = client.get(url)
+                elapsed = time.perf_counter() - started
+                with lock:
+                    if response.status_code == 200:
+                        timings.append(elapsed)
+                    else:
+                        stats['errors'] += 1
+        finally:
+            connections.close_all()
+
+    def write(self, user, titles, stop, lock, created, stats):
+        client = Client(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}',
+            raise_request_exception=False,
+        )
+        try:
+            for title in titles:
+                if stop.is_set():
+                    break
+                response = client.post(
+                    f'/api/v1/titles/{title}/reviews/',
+                    data={'text': 'Нагрузочный тест', 'score': 7},
+                )
+                with lock:
+                    if response.status_code == 201:
+                        stats['writes'] += 1
+                        created.append(response.json()['id'])
+                    elif response.status_code >= 500:
+                        stats['errors'] += 1
+        finally:
+            connections.close_all()
+
+    def run(self, readers, writers, duration):
+        read_title, titles, users = self.get_targets(writers)
+        stop, lock = threading.Event(), threading.Lock()
+        timings, created, stats = [], [], Counter()
+        url = f'/api/v1/titles/{read_title}/reviews/'
+        threads = [
+            threading.Thread(
+                target=self.read, args=(url, stop, lock, timings, stats)
+            )
+            for _ in range(readers)
+        ]
+        threads += [
+            threading.Thread(
+                target=self.write,
+                args=(user, titles, stop, lock, created, stats),
+            )
+            for user in users
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        stop.wait(duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        # Убираем отзывы прогона и пересчитываем рейтинги.
+        Review.objects.filter(pk__in=created).delete()
+        call_command('recalculate_ratings', stdout=StringIO())
+        return {
+            'readers': readers,
+            'writers': writers,
+            'reads': len(timings),
+            'reads_per_second': round(len(timings) / elapsed, 1),
+            'read_p50_ms': round(percentile(timings or [0], 50) * 1000, 3),
+            'read_p95_ms': round(percentile(timings or [0], 95) * 1000, 3),
+            'writes': stats['writes'],
+            'writes_per_second': round(stats['writes'] / elapsed, 1),
+            'errors': stats['errors'],
+        }
@@ -0,0 +1,42 @@
+from pathlib import Path
+
+from django.core.management import BaseCommand, CommandError
+
+from reviews.export import CHUNK_SIZE, FORMATS, TABLES, iter_export
+
+
+class Command(BaseCommand):
+    help = 'Выгружает таблицы в CSV или NDJSON в формате static/data/.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'tables', nargs='*', default=list(TABLES),
+            help='Таблицы для выгрузки: ' + ', '.join(TABLES),
+        )
+        parser.add_argument(
+            '--format', choices=FORMATS, default='csv', dest='file_format',
+        )
+        parser.add_argument(
+            '--output', type=Path, default=Path('.'),
+            help='Каталог, куда записываются файлы.',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=CHUNK_SIZE,
+            help='Сколько строк читать из БД за один раз.',
+        )
+
+    def handle(self, *args, **options):
+        unknown = set(options['tables']) - set(TABLES)
+        if unknown:
+            raise CommandError(
+                'Неизвестные таблицы: ' + ', '.join(sorted(unknown))
+            )
+        options['output'].mkdir(parents=True, exist_ok=True)
+        for table in options['tables']:
+            path = options['output'] / f'{table}.{options["file_format"]}'
+            with open(path, mode='w', encoding='utf-8', newline='') as file:
+                file.writelines(iter_export(
+                    table, options['file_format'], options['chunk_size']
+                ))
+            self.stdout.write(f'{table}: {path}')
+        self.stdout.write(self.style.SUCCESS('Данные успешно выгружены'))
@@ -0,0 +1,170 @@
+import random
+import time
+from collections import Counter
+
+from django.core.management import BaseCommand, CommandError, call_command
+from django.db import transaction
+from django.utils import timezone
+
+from reviews.models import (
+    Category, Comment, CustomUser, Genre, Review, Revision, Title
+)
+
+BATCH_SIZE = 1000
+# Распределение оценок: большинство отзывов ставит 6–9.
+SCORE_WEIGHTS = (2, 2, 3, 4, 6, 9, 14, 18, 15, 10)
+WORDS = (
+    'тайна', 'город', 'ночь', 'море', 'звезда', 'дорога', 'война', 'сад',
+    'огонь', 'зима', 'песня', 'мечта', 'остров', 'ветер', 'король', 'река',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт синтетический каталог для нагрузочных тестов: '
+        'пользователей, категории, жанры, произведения, отзывы и '
+        'комментарии. Результат воспроизводится по --seed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=500)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--genres', type=int, default=30)
+        parser.add_argument('--titles', type=int, default=2000)
+        parser.add_argument('--reviews', type=int, default=20000)
+        parser.add_argument('--comments', type=int, default=10000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--prefix', default='fake',
+            help='Префикс имён и слагов, чтобы не пересекаться с данными.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Сколько строк вставлять за один запрос.',
+        )
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 and options['reviews']:
+            raise CommandError('Для отзывов нужен хотя бы один пользователь.')
+        self.random = random.Random(options['seed'])
+        self.prefix = options['prefix']
+        self.batch_size = options['batch_size']
+        with transaction.atomic():
+            users = self.create_users(options['users'])
+            categories = self.create(Category, [
+                Category(
+                    name=f'Категория {number}',
+                    slug=f'{self.prefix}-category-{number}',
+                )
+                for number in range(options['categories'])
+            ])
+            genres = self.create(Genre, [
+                Genre(
+                    name=f'Жанр {number}',
+                    slug=f'{self.prefix}-genre-{number}',
+                )
+                for number in range(options['genres'])
+            ])
+            titles = self.create_titles(options['titles'], categories, genres)
+            reviews = self.create_reviews(options['reviews'], titles, users)
+            self.create(Comment, [
+                Comment(
+                    review_id=self.random.choice(reviews),
+                    author_id=self.random.choice(users),
+                    text=self.sentence(),
+                )
+                for _ in range(options['comments'] if reviews else 0)
+            ])
+        # Данные созданы в обход сигналов, как и в import_data.
+        Revision.objects.all().delete()
+        call_command('recalculate_ratings', stdout=self.stdout)
+        call_command('rebuild_search_index', stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS('Тестовые данные созданы'))
+
+    def create(self, model, objects):
+        """Вставляет объекты пачками и возвращает их первичные ключи."""
+        started = time.monotonic()
+        last_pk = model.objects.order_by('-pk').values_list(
+            'pk', flat=True).first() or 0
+        model.objects.bulk_create(objects, batch_size=self.batch_size)
+        # SQLite не возвращает ключи из bulk_create, читаем их отдельно.
+        pks = list(model.objects.filter(pk__gt=last_pk).order_by(
+            'pk').values_list('pk', flat=True))
+        self.stdout.write(
+            f'{model._meta.verbose_name_plural}: создано {len(pks)} '
+            f'за {time.monotonic() - started:.2f} с'
+        )
+        return pks
+
+    def sentence(self, words=8):
+        return ' '.join(self.random.choices(WORDS, k=words)).capitalize()
+
+    def create_users(self, count):
+        roles = self.random.choices(
+            (CustomUser.USER, CustomUser.MODERATOR, CustomUser.ADMIN),
+            weights=(90, 8, 2), k=count,
+        )
+        if roles:
+            # Первый пользователь — администратор, от его имени
+            # запросы отправляет команда benchmark.
+            roles[0] = CustomUser.ADMIN
+        return self.create(CustomUser, [
+            CustomUser(
+                username=f'{self.prefix}_user_{number}',
+                email=f'{self.prefix}_user_{number}@yamdb.fake',
+                role=role,
+                password='!',
+            )
+            for number, role in enumerate(roles)
+        ])
+
+    def create_titles(self, count, categories, genres):
+        current_year = timezone.now().year
+        pks = self.create(Title, [
+            Title(
+                name=self.sentence(self.random.randint(1, 4)),
+                year=min(
+                    int(self.random.triangular(1900, current_year, 2010)),
+                    current_year,
+                ),
+                description=self.sentence(30),
+                category_id=(
+                    self.random.choice(categories) if categories else None
+                ),
+            )
+            for _ in range(count)
+        ])
+        through = Title.genre.through
+        self.create(through, [
+            through(title_id=title, genre_id=genre)
+            for title in pks
+            for genre in self.random.sample(
+                genres, min(len(genres), self.random.randint(1, 3))
+            )
+        ])
+        return pks
+
+    def create_reviews(self, count, titles, users):
+        """
+        Распределяет отзывы по закону Ципфа: у немногих популярных
+        произведений тысячи отзывов, у большинства — единицы.
+        """
+        if not titles:
+            return []
+        ranked = self.random.sample(titles, len(titles))
+        weights = [1 / rank for rank in range(1, len(ranked) + 1)]
+        per_title = Counter(
+            self.random.choices(ranked, weights=weights, k=count)
+        )
+        return self.create(Review, [
+            Review(
+                title_id=title,
+                author_id=author,
+                score=self.random.choices(
+                    range(1, 11), weights=SCORE_WEIGHTS)[0],
+                text=self.sentence(),
+            )
+            for title, reviews in per_title.items()
+            # Автор оставляет не больше одного отзыва на произведение.
+            for author in self.random.sample(users, min(reviews, len(users)))
+        ])
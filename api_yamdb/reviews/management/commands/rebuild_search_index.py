@@ -0,0 +1,13 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from reviews import search
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает полнотекстовый индекс произведений.'
+
+    def handle(self, *args, **kwargs):
+        with transaction.atomic():
+            search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS('Поисковый индекс пересобран'))
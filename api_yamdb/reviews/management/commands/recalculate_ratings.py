@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import Avg
+
+from reviews.models import RatingBucket, Review, Revision, Title
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает рейтинг и распределение оценок произведений '
+        'по всем отзывам.'
+    )
+
+    def handle(self, *args, **kwargs):
+        with transaction.atomic():
+            updated = Title.objects.all().recalculate_rating()
+            RatingBucket.objects.rebuild()
+            Revision.touch('catalogue')
+        mean = Review.objects.aggregate(mean=Avg('score'))['mean']
+        if mean is not None:
+            self.stdout.write(
+                f'Средняя оценка по каталогу: {mean:.2f} '
+                f'(RATING_PRIOR_MEAN = {settings.RATING_PRIOR_MEAN})'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Рейтинг пересчитан для {updated} произведений'
+        ))
@@ -0,0 +1,44 @@
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from reviews.outbox import BATCH_SIZE, send_queued
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди исходящей почты.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Сколько писем отправлять через одно соединение.',
+        )
+        parser.add_argument(
+            '--max-attempts', type=int,
+            default=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+            help='После скольких неудач письмо больше не отправляется.',
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать постоянно, проверяя очередь каждые --interval с.',
+        )
+        parser.add_argument('--interval', type=float, default=5)
+
+    def handle(self, *args, **options):
+        while True:
+            stats = send_queued(
+                batch_size=options['batch_size'],
+                max_attempts=options['max_attempts'],
+            )
+            if stats:
+                self.stdout.write(
+                    f'Отправлено {stats["sent"]}, '
+                    f'с ошибкой {stats["failed"]}'
+                )
+            if sum(stats.values()) == options['batch_size']:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS('Очередь писем обработана'))
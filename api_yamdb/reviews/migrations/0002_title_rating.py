@@ -0,0 +1,54 @@
+# Generated by Django 3.2 on 2026-10-18 05:21
+
+from django.db import migrations, models
+from django.db.models import Count, F, FloatField, OuterRef, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce
+
+
+def backfill_ratings(apps, schema_editor):
+    # Исторические модели без TitleQuerySet: тот же пересчёт, что и
+    # recalculate_rating(), иначе у старых произведений рейтинг пуст,
+    # а удаление отзыва уводит rating_count в минус.
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    using = schema_editor.connection.alias
+    reviews = Review.objects.using(using).filter(
+        title=OuterRef('pk')).order_by().values('title')
+    titles = Title.objects.using(using)
+    titles.update(
+        rating_sum=Coalesce(
+            Subquery(reviews.annotate(total=Sum('score')).values('total')), 0
+        ),
+        rating_count=Coalesce(
+            Subquery(reviews.annotate(total=Count('id')).values('total')), 0
+        ),
+    )
+    titles.filter(rating_count__gt=0).update(
+        rating=Cast('rating_sum', FloatField()) / F('rating_count')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Рейтинг'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(backfill_ratings, migrations.RunPython.noop),
+    ]
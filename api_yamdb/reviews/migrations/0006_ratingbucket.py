@@ -0,0 +1,53 @@
+# Generated by Django 3.2 on 2026-10-18 05:52
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def backfill_buckets(apps, schema_editor):
+    # То же, что RatingBucket.objects.rebuild(), на исторических моделях:
+    # дальше гистограмму сдвигают сигналы отзывов.
+    RatingBucket = apps.get_model('reviews', 'RatingBucket')
+    Review = apps.get_model('reviews', 'Review')
+    using = schema_editor.connection.alias
+    counts = Review.objects.using(using).order_by().values(
+        'title_id', 'score').annotate(total=Count('id'))
+    RatingBucket.objects.using(using).bulk_create(
+        [
+            RatingBucket(
+                title_id=row['title_id'], score=row['score'],
+                count=row['total'],
+            )
+            for row in counts.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_outboxemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RatingBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.PositiveSmallIntegerField(verbose_name='Оценка')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Количество')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rating_buckets', to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Количество оценок',
+                'verbose_name_plural': 'Количество оценок',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='ratingbucket',
+            constraint=models.UniqueConstraint(fields=('title', 'score'), name='title_score'),
+        ),
+        migrations.RunPython(backfill_buckets, migrations.RunPython.noop),
+    ]
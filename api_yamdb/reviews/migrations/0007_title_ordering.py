@@ -0,0 +1,52 @@
+# Generated by Django 3.2 on 2026-10-18 05:54
+
+from django.db import migrations, models
+from django.db.models import F
+import reviews.models
+
+
+def backfill_weighted_rating(apps, schema_editor):
+    # Поле добавлено со значением по умолчанию RATING_PRIOR_MEAN; у
+    # произведений с отзывами его нужно посчитать по сумме и числу оценок.
+    Title = apps.get_model('reviews', 'Title')
+    Title.objects.using(schema_editor.connection.alias).filter(
+        rating_count__gt=0
+    ).update(
+        weighted_rating=reviews.models.weighted_rating(
+            F('rating_sum'), F('rating_count')
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_ratingbucket'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='weighted_rating',
+            field=models.FloatField(default=reviews.models.default_weighted_rating, editable=False, verbose_name='Взвешенный рейтинг'),
+        ),
+        migrations.RunPython(
+            backfill_weighted_rating, migrations.RunPython.noop
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['rating', 'id'], name='title_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['weighted_rating', 'id'], name='title_weighted_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['rating_count', 'id'], name='title_rating_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['name', 'id'], name='title_name_idx'),
+        ),
+    ]
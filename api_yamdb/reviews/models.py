@@ -1,4 +1,9 @@
+from django.conf import settings
 from django.db import models
+from django.db.models import (
+    Case, Count, F, FloatField, OuterRef, Subquery, Sum, When
+)
+from django.db.models.functions import Cast, Coalesce
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.utils import timezone
@@ -38,6 +43,14 @@ class CustomUser(AbstractUser):
     def __str__(self):
         return self.username
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        # Имя на момент загрузки: по нему сигналы понимают, изменилось ли
+        # имя автора в отзывах и комментариях.
+        user._loaded_username = user.__dict__.get('username')
+        return user
+
     @property
     def is_admin(self):
         return self.role == self.ADMIN or self.is_superuser
@@ -85,6 +98,73 @@ class Genre(models.Model):
         return self.name
 
 
+def default_weighted_rating():
+    return settings.RATING_PRIOR_MEAN
+
+
+def weighted_rating(rating_sum, rating_count):
+    """
+    Байесовский рейтинг: средняя оценка, к которой добавлено
+    RATING_PRIOR_WEIGHT оценок, равных RATING_PRIOR_MEAN.
+
+    У произведений с парой отзывов он близок к средней по каталогу,
+    поэтому одна десятка не поднимает их выше популярных.
+    """
+    weight = settings.RATING_PRIOR_WEIGHT
+    return (
+        Cast(rating_sum + weight * settings.RATING_PRIOR_MEAN, FloatField())
+        / (rating_count + weight)
+    )
+
+
+class TitleQuerySet(models.QuerySet):
+
+    def update_rating(self, score_delta, count_delta):
+        """
+        Сдвигает сумму и количество оценок и пересчитывает рейтинг.
+
+        Выполняется одним UPDATE без чтения отзывов, поэтому должен
+        вызываться в той же транзакции, что и изменение отзыва.
+        """
+        rating_sum = F('rating_sum') + score_delta
+        rating_count = F('rating_count') + count_delta
+        return self.update(
+            rating_sum=rating_sum,
+            rating_count=rating_count,
+            rating=Case(
+                When(rating_count=-count_delta, then=None),
+                default=Cast(rating_sum, FloatField()) / rating_count,
+                output_field=FloatField(),
+            ),
+            weighted_rating=weighted_rating(rating_sum, rating_count),
+        )
+
+    def recalculate_rating(self):
+        """Пересчитывает сумму, количество оценок и рейтинг с нуля."""
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')).order_by().values('title')
+        self.update(
+            rating_sum=Coalesce(
+                Subquery(reviews.annotate(total=Sum('score')).values('total')),
+                0
+            ),
+            rating_count=Coalesce(
+                Subquery(reviews.annotate(total=Count('id')).values('total')),
+                0
+            ),
+        )
+        return self.update(
+            rating=Case(
+                When(rating_count=0, then=None),
+                default=Cast('rating_sum', FloatField()) / F('rating_count'),
+                output_field=FloatField(),
+            ),
+            weighted_rating=weighted_rating(
+                F('rating_sum'), F('rating_count')
+            ),
+        )
+
+
 class Title(models.Model):
     """Модель произведения."""
 
@@ -107,16 +187,60 @@ class Title(models.Model):
         verbose_name='Категория',
         null=True,
     )
+    rating_sum = models.PositiveIntegerField(
+        'Сумма оценок', default=0, editable=False,
+    )
+    rating_count = models.PositiveIntegerField(
+        'Количество оценок', default=0, editable=False,
+    )
+    rating = models.FloatField(
+        'Рейтинг', null=True, blank=True, editable=False,
+    )
+    weighted_rating = models.FloatField(
+        'Взвешенный рейтинг', default=default_weighted_rating,
+        editable=False,
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
         ordering = ('year',)
+        # Сортировки списка произведений (?ordering=...) и фильтры TitleFilter.
+        indexes = [
+            models.Index(fields=['year', 'id'], name='title_year_idx'),
+            models.Index(
+                fields=['category', 'year', 'id'],
+                name='title_category_year_idx',
+            ),
+            models.Index(fields=['rating', 'id'], name='title_rating_idx'),
+            models.Index(
+                fields=['weighted_rating', 'id'],
+                name='title_weighted_rating_idx',
+            ),
+            models.Index(
+                fields=['rating_count', 'id'], name='title_rating_count_idx',
+            ),
+            models.Index(fields=['name', 'id'], name='title_name_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
 
+class ReviewQuerySet(models.QuerySet):
+
+    def with_comments_count(self):
+        """Добавляет comments_count одним подзапросом на выборку."""
+        comments = Comment.objects.filter(
+            review=OuterRef('pk')).order_by().values('review')
+        return self.annotate(comments_count=Coalesce(
+            Subquery(comments.annotate(total=Count('id')).values('total')),
+            0
+        ))
+
+
 class Review(models.Model):
     """Отзыв к произведению."""
 
@@ -144,10 +268,19 @@ class Review(models.Model):
         auto_now_add=True
     )
 
+    objects = ReviewQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
         ordering = ('-pub_date',)
+        # Список отзывов к произведению, новые сначала.
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date', '-id'],
+                name='review_title_pub_date_idx',
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['title', 'author'],
@@ -157,6 +290,16 @@ class Review(models.Model):
     def __str__(self):
         return f'{self.author}: {self.text}'[:50]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        review = super().from_db(db, field_names, values)
+        # Произведение и оценка на момент загрузки: сигналы сдвигают
+        # рейтинг на разницу, не перечитывая отзыв.
+        review._loaded_rating = (
+            review.__dict__.get('title_id'), review.__dict__.get('score')
+        )
+        return review
+
 
 class Comment(models.Model):
     """Комментарии к отзыву."""
@@ -183,9 +326,156 @@ class Comment(models.Model):
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        ordering = ('pub_date',)
+        # Список комментариев к отзыву в порядке публикации.
+        indexes = [
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_pub_date_idx',
+            ),
+        ]
 
     def __str__(self):
         return (
             f'{self.author}: '
             f'{timezone.localtime(self.pub_date).strftime("%Y-%m-%d %H:%M")}'
         )
+
+
+class RatingBucketQuerySet(models.QuerySet):
+
+    def shift(self, title_id, score, delta):
+        """Сдвигает число оценок score у произведения на delta."""
+        bucket = self.filter(title_id=title_id, score=score)
+        # Уменьшать нечего, если строки нет: например, при удалении
+        # произведения его гистограмма удаляется раньше отзывов.
+        if not bucket.update(count=F('count') + delta) and delta > 0:
+            self.bulk_create(
+                [RatingBucket(title_id=title_id, score=score)],
+                ignore_conflicts=True,
+            )
+            bucket.update(count=F('count') + delta)
+
+    def histograms(self, title_ids):
+        """Гистограммы оценок: {title_id: [число оценок 1, ..., 10]}."""
+        result = {title_id: [0] * 10 for title_id in title_ids}
+        buckets = self.filter(title_id__in=title_ids).values_list(
+            'title_id', 'score', 'count')
+        for title_id, score, count in buckets:
+            result[title_id][score - 1] = count
+        return result
+
+    def rebuild(self, title_ids=None):
+        """
+        Пересобирает по отзывам гистограммы произведений title_ids
+        (по умолчанию всех).
+        """
+        buckets, reviews = self.all(), Review.objects.using(self.db)
+        if title_ids is not None:
+            buckets = buckets.filter(title_id__in=title_ids)
+            reviews = reviews.filter(title_id__in=title_ids)
+        buckets.delete()
+        counts = reviews.order_by().values(
+            'title_id', 'score').annotate(total=Count('id'))
+        return self.bulk_create(
+            [
+                RatingBucket(
+                    title_id=row['title_id'], score=row['score'],
+                    count=row['total'],
+                )
+                for row in counts.iterator()
+            ],
+            batch_size=1000,
+        )
+
+
+class RatingBucket(models.Model):
+    """
+    Число оценок score у произведения.
+
+    Строки обновляются вместе с рейтингом при изменении отзывов, поэтому
+    распределение оценок читается без GROUP BY по отзывам.
+    """
+
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='rating_buckets',
+        verbose_name='Произведение',
+    )
+    score = models.PositiveSmallIntegerField('Оценка')
+    count = models.PositiveIntegerField('Количество', default=0)
+
+    objects = RatingBucketQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Количество оценок'
+        verbose_name_plural = 'Количество оценок'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'score'],
+                name='title_score'),
+        ]
+
+    def __str__(self):
+        return f'{self.title_id}: {self.score} — {self.count}'
+
+
+class Revision(models.Model):
+    """
+    Время последнего изменения набора данных.
+
+    Набор задаётся строкой scope (например, `catalogue` или
+    `title:1:reviews`); по нему API строит ETag и Last-Modified,
+    не читая и не сериализуя сами данные.
+    """
+
+    scope = models.CharField('Область', max_length=64, primary_key=True)
+    updated = models.DateTimeField('Изменено')
+
+    class Meta:
+        verbose_name = 'Ревизия'
+        verbose_name_plural = 'Ревизии'
+
+    def __str__(self):
+        return f'{self.scope}: {self.updated}'
+
+    @classmethod
+    def touch(cls, *scopes, using='default'):
+        """Отмечает наборы данных изменёнными сейчас."""
+        now = timezone.now()
+        manager = cls.objects.using(using)
+        if manager.filter(scope__in=scopes).update(updated=now) < len(scopes):
+            manager.bulk_create(
+                [cls(scope=scope, updated=now) for scope in scopes],
+                ignore_conflicts=True,
+            )
+
+
+class OutboxEmail(models.Model):
+    """
+    Письмо в очереди на отправку.
+
+    Записывается в транзакции запроса, а отправляется командой
+    send_outbox, поэтому время ответа не зависит от почтового сервера.
+    """
+
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст')
+    from_email = models.CharField('Отправитель', max_length=254, blank=True)
+    to = models.JSONField('Получатели')
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    next_attempt = models.DateTimeField(
+        'Следующая попытка', default=timezone.now, db_index=True,
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('next_attempt', 'pk')
+
+    def __str__(self):
+        return f'{", ".join(self.to)}: {self.subject}'
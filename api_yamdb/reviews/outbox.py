@@ -0,0 +1,149 @@
+"""
+Очередь исходящей почты.
+
+enqueue() записывает письмо в таблицу OutboxEmail в текущей транзакции,
+send_queued() отправляет пачку писем через одно соединение с почтовым
+сервером. Неотправленные письма остаются в очереди и повторяются с
+экспоненциально растущей паузой, пока не исчерпан лимит попыток.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+BATCH_SIZE = 100
+
+
+def is_eager():
+    """
+    Отправлять ли письмо сразу после коммита: по EMAIL_OUTBOX_EAGER,
+    а если он не задан — только для локальных бэкендов почты.
+    """
+    if settings.EMAIL_OUTBOX_EAGER is not None:
+        return settings.EMAIL_OUTBOX_EAGER
+    return settings.EMAIL_BACKEND in settings.EMAIL_OUTBOX_EAGER_BACKENDS
+
+
+def enqueue(subject, body, to, from_email=None):
+    """
+    Ставит письмо в очередь.
+
+    Если is_eager(), письмо отправляется сразу после коммита, а при
+    ошибке остаётся в очереди для send_outbox.
+    """
+    message = OutboxEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email or '',
+        to=list(to),
+    )
+    if is_eager():
+        transaction.on_commit(lambda: send_queued(
+            OutboxEmail.objects.filter(pk=message.pk)
+        ))
+    return message
+
+
+def pending(max_attempts=None, now=None):
+    """Письма, которые пора отправить."""
+    if max_attempts is None:
+        max_attempts = settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+    return OutboxEmail.objects.filter(
+        sent_at__isnull=True,
+        attempts__lt=max_attempts,
+        next_attempt__lte=now or timezone.now(),
+    )
+
+
+def retry_at(attempts, now):
+    return now + timedelta(
+        seconds=settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    )
+
+
+def claim(queryset, batch_size, now):
+    """
+    Забирает до batch_size писем. Каждое письмо берётся условным UPDATE,
+    который увеличивает attempts и переносит next_attempt на паузу
+    повтора, как аренду: другой обработчик его уже не выберет, а если
+    этот упадёт посреди отправки, письмо повторится после паузы.
+    """
+    claimed = []
+    for message in queryset[:batch_size]:
+        attempts = message.attempts + 1
+        next_attempt = retry_at(attempts, now)
+        if OutboxEmail.objects.filter(
+            pk=message.pk, attempts=message.attempts, sent_at__isnull=True
+        ).update(attempts=attempts, next_attempt=next_attempt):
+            message.attempts, message.next_attempt = attempts, next_attempt
+            claimed.append(message)
+    return claimed
+
+
+def send_queued(queryset=None, batch_size=BATCH_SIZE, max_attempts=None):
+    """
+    Отправляет до batch_size писем из очереди и возвращает Counter
+    с количеством отправленных ('sent') и неудачных ('failed') писем.
+
+    Письма забираются короткими записями (claim), отправляются без
+    открытой транзакции, а результат записывается отдельно. Поэтому
+    запись в очередь из других соединений не мешает сохранить sent_at,
+    и доставленное письмо не отправляется повторно.
+    """
+    now = timezone.now()
+    if queryset is None:
+        queryset = OutboxEmail.objects.all()
+    queryset = queryset & pending(max_attempts, now)
+    stats = Counter()
+    messages = claim(queryset, batch_size, now)
+    if not messages:
+        return stats
+    sent, failed = deliver(messages)
+    if sent:
+        OutboxEmail.objects.filter(pk__in=sent).update(sent_at=now)
+        stats['sent'] = len(sent)
+    if failed:
+        OutboxEmail.objects.bulk_update(failed, ('last_error',))
+        stats['failed'] = len(failed)
+    return stats
+
+
+def deliver(messages):
+    """
+    Отправляет письма через одно соединение и возвращает pk отправленных
+    и список неудачных писем.
+    """
+    sent, failed = [], []
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        for message in messages:
+            fail(message, error)
+        return sent, list(messages)
+    for message in messages:
+        try:
+            EmailMessage(
+                message.subject,
+                message.body,
+                message.from_email or None,
+                message.to,
+                connection=connection,
+            ).send()
+        except Exception as error:
+            fail(message, error)
+            failed.append(message)
+        else:
+            sent.append(message.pk)
+    connection.close()
+    return sent, failed
+
+
+def fail(message, error):
+    # Попытка уже учтена в claim(), повтор отложен до next_attempt.
+    message.last_error = f'{type(error).__name__}: {error}'
@@ -0,0 +1,196 @@
+"""
+Полнотекстовый индекс произведений.
+
+Индекс хранится в отдельной таблице `reviews_title_search` и содержит
+название, описание, жанры и категорию каждого произведения. Для SQLite
+это виртуальная таблица FTS5, для PostgreSQL — столбец tsvector с
+GIN-индексом. Документы собираются одним INSERT ... SELECT, поэтому
+переиндексация не требует чтения объектов в Python.
+"""
+import re
+
+from django.db import connections
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+
+SEARCH_TABLE = 'reviews_title_search'
+TITLE_TABLE = 'reviews_title'
+INDEX_BATCH_SIZE = 500
+
+TOKEN_RE = re.compile(r'\w+')
+
+# Имена жанров одного произведения одной строкой.
+GENRES_SQL = (
+    'SELECT {aggregate} FROM reviews_title_genre tg '
+    'JOIN reviews_genre g ON g.id = tg.genre_id '
+    'WHERE tg.title_id = t.id'
+)
+
+
+class SQLiteTitleSearch:
+    """Индекс на FTS5: ранжирование bm25, префиксный поиск `слово*`."""
+
+    create_sql = (
+        f'CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5('
+        "name, description, genres, category, tokenize = 'unicode61')",
+    )
+    drop_sql = f'DROP TABLE IF EXISTS {SEARCH_TABLE}'
+    delete_sql = f'DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({{ids}})'
+    clear_sql = f'DELETE FROM {SEARCH_TABLE}'
+    insert_sql = (
+        f'INSERT INTO {SEARCH_TABLE} '
+        '(rowid, name, description, genres, category) '
+        "SELECT t.id, t.name, COALESCE(t.description, ''), "
+        "COALESCE(("
+        + GENRES_SQL.format(aggregate="group_concat(g.name, ' ')")
+        + "), ''), "
+        "COALESCE(c.name, '') "
+        f'FROM {TITLE_TABLE} t '
+        'LEFT JOIN reviews_category c ON c.id = t.category_id'
+    )
+    # Условие соединения индекса с произведениями: MATCH выполняется
+    # один раз на запрос, а не для каждой строки.
+    match_sql = (
+        f'{SEARCH_TABLE} MATCH %s '
+        f'AND {SEARCH_TABLE}.rowid = {TITLE_TABLE}.id'
+    )
+    # Веса столбцов bm25: name, description, genres, category.
+    rank_sql = f'bm25({SEARCH_TABLE}, 10.0, 1.0, 3.0, 3.0)'
+
+    def build_query(self, tokens):
+        return ' '.join(f'"{token}"*' for token in tokens)
+
+
+class PostgresTitleSearch:
+    """Индекс на tsvector: ранжирование ts_rank, префиксный поиск `:*`."""
+
+    create_sql = (
+        f'CREATE TABLE {SEARCH_TABLE} ('
+        f'title_id bigint PRIMARY KEY REFERENCES {TITLE_TABLE} (id) '
+        'ON DELETE CASCADE, document tsvector NOT NULL)',
+        f'CREATE INDEX {SEARCH_TABLE}_document '
+        f'ON {SEARCH_TABLE} USING GIN (document)',
+    )
+    drop_sql = f'DROP TABLE IF EXISTS {SEARCH_TABLE}'
+    delete_sql = f'DELETE FROM {SEARCH_TABLE} WHERE title_id IN ({{ids}})'
+    clear_sql = f'DELETE FROM {SEARCH_TABLE}'
+    insert_sql = (
+        f'INSERT INTO {SEARCH_TABLE} (title_id, document) '
+        'SELECT t.id, '
+        "setweight(to_tsvector('simple', t.name), 'A') || "
+        "setweight(to_tsvector('simple', COALESCE(t.description, '')), 'C')"
+        " || setweight(to_tsvector('simple', COALESCE(("
+        + GENRES_SQL.format(aggregate="string_agg(g.name, ' ')")
+        + "), '')), 'B') || "
+        "setweight(to_tsvector('simple', COALESCE(c.name, '')), 'B') "
+        f'FROM {TITLE_TABLE} t '
+        'LEFT JOIN reviews_category c ON c.id = t.category_id'
+    )
+    match_sql = (
+        f"{SEARCH_TABLE}.document @@ to_tsquery('simple', %s) "
+        f'AND {SEARCH_TABLE}.title_id = {TITLE_TABLE}.id'
+    )
+    # Ранг со знаком минус, чтобы лучшие совпадения шли первыми, как у bm25.
+    rank_sql = (
+        f"-ts_rank({SEARCH_TABLE}.document, to_tsquery('simple', %s))"
+    )
+
+    def build_query(self, tokens):
+        return ' & '.join(f'{token}:*' for token in tokens)
+
+
+BACKENDS = {
+    'sqlite': SQLiteTitleSearch,
+    'postgresql': PostgresTitleSearch,
+}
+
+
+def get_backend(connection):
+    """Индекс для СУБД соединения или None, если СУБД не поддерживается."""
+    backend_class = BACKENDS.get(connection.vendor)
+    return backend_class() if backend_class else None
+
+
+def create_index(schema_editor):
+    backend = get_backend(schema_editor.connection)
+    if backend:
+        for sql in backend.create_sql:
+            schema_editor.execute(sql)
+        schema_editor.execute(backend.insert_sql)
+
+
+def drop_index(schema_editor):
+    backend = get_backend(schema_editor.connection)
+    if backend:
+        schema_editor.execute(backend.drop_sql)
+
+
+def _batches(title_ids):
+    title_ids = list(title_ids)
+    for start in range(0, len(title_ids), INDEX_BATCH_SIZE):
+        batch = title_ids[start:start + INDEX_BATCH_SIZE]
+        yield batch, ', '.join(['%s'] * len(batch))
+
+
+def index_titles(title_ids, using='default'):
+    """Пересобирает документы указанных произведений."""
+    connection = connections[using]
+    backend = get_backend(connection)
+    if not backend:
+        return
+    with connection.cursor() as cursor:
+        for batch, placeholders in _batches(title_ids):
+            cursor.execute(backend.delete_sql.format(ids=placeholders), batch)
+            cursor.execute(
+                f'{backend.insert_sql} WHERE t.id IN ({placeholders})', batch
+            )
+
+
+def remove_titles(title_ids, using='default'):
+    """Удаляет документы указанных произведений из индекса."""
+    connection = connections[using]
+    backend = get_backend(connection)
+    if not backend:
+        return
+    with connection.cursor() as cursor:
+        for batch, placeholders in _batches(title_ids):
+            cursor.execute(backend.delete_sql.format(ids=placeholders), batch)
+
+
+def rebuild_index(using='default'):
+    """Пересобирает индекс для всех произведений."""
+    connection = connections[using]
+    backend = get_backend(connection)
+    if not backend:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(backend.clear_sql)
+        cursor.execute(backend.insert_sql)
+
+
+def search_titles(queryset, query):
+    """
+    Отбирает произведения по поисковой строке и сортирует по релевантности.
+
+    Каждое слово запроса ищется как префикс, слова объединяются по И.
+    Если СУБД не поддерживает индекс, используется поиск по названию.
+    """
+    tokens = TOKEN_RE.findall(query.lower())
+    if not tokens:
+        return queryset.none()
+    backend = get_backend(connections[queryset.db])
+    if not backend:
+        for token in tokens:
+            queryset = queryset.filter(name__icontains=token)
+        return queryset
+    match = backend.build_query(tokens)
+    # Индекс присоединяется к запросу один раз, ранг берётся из той же
+    # строки индекса.
+    return queryset.extra(
+        tables=[SEARCH_TABLE], where=[backend.match_sql], params=[match]
+    ).annotate(
+        search_rank=RawSQL(
+            backend.rank_sql, [match] * backend.rank_sql.count('%s'),
+            output_field=FloatField(),
+        )
+    ).order_by('search_rank', 'pk')
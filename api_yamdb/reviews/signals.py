@@ -0,0 +1,174 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_save, pre_delete
+)
+from django.dispatch import receiver
+
+from . import search
+from .models import (
+    Category, Comment, CustomUser, Genre, RatingBucket, Review, Revision,
+    Title
+)
+
+
+@receiver(post_save, sender=Title)
+def index_title(sender, instance, raw=False, using='default', **kwargs):
+    if not raw:
+        search.index_titles([instance.pk], using=using)
+
+
+@receiver(post_delete, sender=Title)
+def unindex_title(sender, instance, using='default', **kwargs):
+    search.remove_titles([instance.pk], using=using)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def index_title_genres(sender, instance, action, reverse, pk_set,
+                       using='default', **kwargs):
+    if reverse and action == 'pre_clear':
+        instance._search_title_ids = list(
+            instance.titles.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        title_ids = [instance.pk]
+    elif action == 'post_clear':
+        title_ids = instance._search_title_ids
+    else:
+        title_ids = pk_set
+    search.index_titles(title_ids, using=using)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Category)
+def index_related_titles(sender, instance, created, raw=False,
+                         using='default', **kwargs):
+    if not raw and not created:
+        search.index_titles(
+            instance.titles.values_list('pk', flat=True), using=using)
+
+
+@receiver(pre_delete, sender=Genre)
+@receiver(pre_delete, sender=Category)
+def remember_related_titles(sender, instance, **kwargs):
+    instance._search_title_ids = list(
+        instance.titles.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Category)
+def reindex_related_titles(sender, instance, using='default', **kwargs):
+    search.index_titles(instance._search_title_ids, using=using)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Genre)
+@receiver(m2m_changed, sender=Title.genre.through)
+def touch_catalogue(sender, using='default', **kwargs):
+    Revision.touch('catalogue', using=using)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def touch_title(sender, instance, using='default', **kwargs):
+    Revision.touch('titles', f'title:{instance.pk}', using=using)
+
+
+@receiver(post_save, sender=Review)
+def add_to_title_rating(sender, instance, created, raw=False,
+                        using='default', **kwargs):
+    if raw:
+        return
+    titles = Title.objects.using(using)
+    buckets = RatingBucket.objects.using(using)
+    title_id, score = instance.title_id, instance.score
+    old_title_id, old_score = (
+        (None, None) if created
+        else getattr(instance, '_loaded_rating', (None, None))
+    )
+    if created:
+        titles.filter(pk=title_id).update_rating(score, 1)
+        buckets.shift(title_id, score, 1)
+    elif old_score is None:
+        # Отзыв сохранён без загрузки из БД: прежняя оценка неизвестна.
+        title_ids = {title_id, old_title_id} - {None}
+        titles.filter(pk__in=title_ids).recalculate_rating()
+        buckets.rebuild(title_ids)
+    elif old_title_id != title_id:
+        titles.filter(pk=old_title_id).update_rating(-old_score, -1)
+        titles.filter(pk=title_id).update_rating(score, 1)
+        buckets.shift(old_title_id, old_score, -1)
+        buckets.shift(title_id, score, 1)
+    elif old_score != score:
+        titles.filter(pk=title_id).update_rating(score - old_score, 0)
+        buckets.shift(title_id, old_score, -1)
+        buckets.shift(title_id, score, 1)
+    instance._loaded_rating = (title_id, score)
+
+
+@receiver(post_delete, sender=Review)
+def remove_from_title_rating(sender, instance, using='default', **kwargs):
+    # Срабатывает и при каскадном удалении (пользователя, произведения).
+    title_id, score = getattr(
+        instance, '_loaded_rating', (instance.title_id, instance.score)
+    )
+    Title.objects.using(using).filter(pk=title_id).update_rating(-score, -1)
+    RatingBucket.objects.using(using).shift(title_id, score, -1)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def touch_reviews(sender, instance, using='default', **kwargs):
+    # Отзыв меняет список отзывов и рейтинг своего произведения, а с ним
+    # и список произведений; категорий, жанров и других произведений он
+    # не касается.
+    Revision.touch(
+        f'title:{instance.title_id}:reviews', f'title:{instance.title_id}',
+        'titles', using=using
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def touch_comments(sender, instance, using='default', **kwargs):
+    # Число комментариев входит в отзыв, поэтому меняется и список отзывов.
+    scopes = [f'review:{instance.review_id}:comments']
+    if Comment.review.is_cached(instance):
+        title_id = instance.review.title_id
+    else:
+        title_id = Review.objects.using(using).filter(
+            pk=instance.review_id
+        ).values_list('title_id', flat=True).first()
+    if title_id is not None:
+        scopes.append(f'title:{title_id}:reviews')
+    Revision.touch(*scopes, using=using)
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def touch_users(sender, instance, created=False, using='default',
+                **kwargs):
+    scopes = ['users', f'user:{instance.pk}']
+    # Из данных пользователя отзывы и комментарии показывают только имя
+    # автора. Удалённый пользователь уходит вместе со своими отзывами и
+    # комментариями, их области отмечают свои сигналы.
+    if created or instance.username != getattr(
+        instance, '_loaded_username', None
+    ):
+        scopes.append('authors')
+    Revision.touch(*scopes, using=using)
+    instance._loaded_username = instance.username
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Настраивает каждое новое соединение с SQLite по SQLITE_PRAGMAS."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
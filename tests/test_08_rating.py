@@ -0,0 +1,131 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_single_review, create_titles, migrate_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_rating(self, client, title_id):
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['rating']
+
+    def test_01_rating_follows_reviews(self, client, admin_client,
+                                       user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        assert self.get_rating(client, title_id) is None, (
+            'Если отзывов о произведении нет - значением поля `rating` '
+            'должно быть `None`.'
+        )
+
+        review = create_single_review(admin_client, title_id, 'a', 4).json()
+        create_single_review(user_client, title_id, 'b', 8)
+        assert self.get_rating(client, title_id) == 6, (
+            'Проверьте, что рейтинг пересчитывается при создании отзыва.'
+        )
+
+        url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=title_id, review_id=review['id']
+        )
+        response = admin_client.patch(url, data={'score': 10})
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_rating(client, title_id) == 9, (
+            'Проверьте, что рейтинг пересчитывается при изменении оценки.'
+        )
+
+        response = admin_client.delete(url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_rating(client, title_id) == 8, (
+            'Проверьте, что рейтинг пересчитывается при удалении отзыва.'
+        )
+
+        assert self.get_rating(client, titles[1]['id']) is None, (
+            'Отзывы одного произведения не должны влиять на рейтинг другого.'
+        )
+
+    def test_02_recalculate_ratings_command(self, client, admin_client,
+                                            user_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'a', 3)
+        create_single_review(user_client, title_id, 'b', 6)
+        Title.objects.update(rating_sum=0, rating_count=0, rating=None)
+
+        call_command('recalculate_ratings')
+
+        title = Title.objects.get(pk=title_id)
+        assert (title.rating_sum, title.rating_count) == (9, 2), (
+            'Проверьте, что команда `recalculate_ratings` пересчитывает '
+            'сумму и количество оценок по отзывам.'
+        )
+        assert self.get_rating(client, title_id) == 4.5
+        assert self.get_rating(client, titles[1]['id']) is None
+
+    def test_03_rating_follows_cascade_delete(self, client, admin_client,
+                                              user_client, user):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'a', 10)
+        create_single_review(user_client, title_id, 'b', 2)
+        assert self.get_rating(client, title_id) == 6
+
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_rating(client, title_id) == 10, (
+            'Проверьте, что рейтинг пересчитывается, когда отзыв удаляется '
+            'вместе с автором.'
+        )
+        title = Title.objects.get(pk=title_id)
+        assert (title.rating_sum, title.rating_count) == (10, 1)
+
+        Title.objects.get(pk=title_id).reviews.get().delete()
+        assert self.get_rating(client, title_id) is None, (
+            'Проверьте, что рейтинг пересчитывается при удалении отзыва '
+            'через ORM.'
+        )
+
+    def test_04_migration_backfills_rating(self, client):
+        from reviews.models import Review
+
+        apps = migrate_reviews('0001_initial')
+        try:
+            title = apps.get_model('reviews', 'Title').objects.create(
+                name='Старое', year=1990
+            )
+            for number, score in enumerate((4, 9)):
+                author = apps.get_model(
+                    'reviews', 'CustomUser'
+                ).objects.create(
+                    username=f'old{number}', email=f'old{number}@yamdb.fake'
+                )
+                apps.get_model('reviews', 'Review').objects.create(
+                    title=title, author=author, text='Отзыв', score=score
+                )
+        finally:
+            migrate_reviews()
+
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title.pk)
+        ).json()
+        assert (response['rating'], response['reviews_count']) == (6.5, 2), (
+            'Проверьте, что миграция заполняет рейтинг уже существующих '
+            'произведений.'
+        )
+        Review.objects.filter(title_id=title.pk).first().delete()
+        assert self.get_rating(client, title.pk) in (4, 9)
@@ -0,0 +1,103 @@
+import json
+from base64 import urlsafe_b64encode
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09KeysetPagination:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def titles(self):
+        from reviews.models import Category, Title
+
+        category = Category.objects.create(name='Фильм', slug='movie')
+        return Title.objects.bulk_create(
+            Title(name=f'title {idx}', year=1990 + idx % 3, category=category)
+            for idx in range(23)
+        )
+
+    def walk(self, client, url, link):
+        pages = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            assert 'count' not in data, (
+                'Ответ keyset-пагинации не должен содержать `count`.'
+            )
+            pages.append([title['id'] for title in data['results']])
+            url = data[link]
+        return pages
+
+    def test_01_keyset_walks_all_pages(self, client, titles):
+        from reviews.models import Title
+
+        expected = list(
+            Title.objects.order_by('year', 'pk').values_list('id', flat=True)
+        )
+
+        pages = self.walk(client, self.TITLES_URL + '?cursor=', 'next')
+        assert [len(page) for page in pages] == [10, 10, 3]
+        assert sum(pages, []) == expected, (
+            'Проверьте, что keyset-пагинация возвращает записи в порядке '
+            '(year, id) без пропусков и повторов.'
+        )
+
+        last_page = client.get(self.TITLES_URL + '?cursor=').json()
+        while last_page['next']:
+            last_page = client.get(last_page['next']).json()
+        backward = self.walk(client, last_page['previous'], 'previous')
+        assert list(reversed(backward)) == pages[:-1], (
+            'Проверьте, что ссылка `previous` возвращает предыдущие страницы.'
+        )
+
+    def test_02_invalid_cursor(self, client, titles):
+        response = client.get(self.TITLES_URL + '?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_03_cursor_with_wrong_types(self, client, titles):
+        from reviews.models import Title
+
+        for position in (
+            ['год', 1], [1990, [1]], [1990, None], [{'year': 1990}, 1],
+            [1990],
+        ):
+            cursor = urlsafe_b64encode(
+                json.dumps({'p': position, 'r': 0}).encode()
+            ).decode()
+            response = client.get(self.TITLES_URL, {'cursor': cursor})
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                'Проверьте, что курсор со значениями неверного типа '
+                f'{position} возвращает ответ со статусом 404.'
+            )
+
+        cursor = urlsafe_b64encode(
+            json.dumps(
+                {'p': ['1990', str(Title.objects.first().pk)], 'r': 0}
+            ).encode()
+        ).decode()
+        response = client.get(self.TITLES_URL, {'cursor': cursor})
+        assert response.status_code == HTTPStatus.OK
+
+    def test_04_forged_search_cursor(self, client, titles):
+        titles[0].name = 'Город'
+        titles[0].save()
+        response = client.get(self.TITLES_URL, {'q': 'город', 'cursor': ''})
+        assert [title['id'] for title in response.json()['results']] == [
+            titles[0].pk
+        ]
+        for position in ([{'a': 1}, 1], [[1, 2], 1], ['ранг', 1]):
+            cursor = urlsafe_b64encode(
+                json.dumps({'p': position, 'r': 0}).encode()
+            ).decode()
+            response = client.get(
+                self.TITLES_URL, {'q': 'город', 'cursor': cursor}
+            )
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                'Проверьте, что поддельный курсор поиска '
+                f'{position} возвращает ответ со статусом 404.'
+            )
@@ -0,0 +1,76 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def search(self, client, query):
+        response = client.get(self.TITLES_URL, {'q': query})
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search_by_prefix(self, client, admin_client):
+        create_titles(admin_client)
+
+        assert self.search(client, 'термин') == ['Терминатор'], (
+            'Проверьте, что параметр `q` ищет произведения по началу слова '
+            'в названии.'
+        )
+        assert self.search(client, 'yippie') == ['Крепкий орешек'], (
+            'Проверьте, что параметр `q` ищет по описанию произведения.'
+        )
+        assert self.search(client, 'комед') == ['Терминатор'], (
+            'Проверьте, что параметр `q` ищет по названию жанра.'
+        )
+        assert self.search(client, 'термин yippie') == []
+        assert self.search(client, '!!!') == []
+
+    def test_02_index_follows_changes(self, client, admin_client):
+        titles, _, genres = create_titles(admin_client)
+
+        response = admin_client.patch(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id']),
+            data={'name': 'Хищник', 'genre': [genres[2]['slug']]}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.search(client, 'термин') == []
+        assert sorted(self.search(client, 'драм')) == [
+            'Крепкий орешек', 'Хищник'
+        ], (
+            'Проверьте, что поисковый индекс обновляется при изменении '
+            'названия и жанров произведения.'
+        )
+
+        admin_client.delete(f'/api/v1/genres/{genres[2]["slug"]}/')
+        assert self.search(client, 'драм') == [], (
+            'Проверьте, что поисковый индекс обновляется при удалении жанра.'
+        )
+
+    def test_03_index_is_matched_once(self, client, admin_client):
+        create_titles(admin_client)
+
+        with CaptureQueriesContext(connection) as context:
+            names = self.search(client, 'орешек')
+        assert names == ['Крепкий орешек']
+        searches = [
+            query['sql'] for query in context.captured_queries
+            if 'reviews_title_search' in query['sql']
+        ]
+        assert searches and all(
+            sql.count('MATCH') == 1 for sql in searches
+        ), (
+            'Проверьте, что поиск обращается к полнотекстовому индексу '
+            'один раз на запрос, а не для каждого произведения.'
+        )
+
+        response = client.get(self.TITLES_URL, {'q': 'е', 'cursor': ''})
+        assert response.status_code == HTTPStatus.OK
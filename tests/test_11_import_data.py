@@ -0,0 +1,123 @@
+import shutil
+import threading
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ImportData:
+
+    def import_data(self, *args):
+        out = StringIO()
+        call_command('import_data', *args, stdout=out)
+        return out.getvalue()
+
+    def test_01_import_is_batched_and_idempotent(
+            self, django_assert_max_num_queries):
+        from reviews.models import Comment, Review, Title
+
+        with django_assert_max_num_queries(50):
+            self.import_data('--batch-size', '50')
+        counts = (Title.objects.count(), Review.objects.count(),
+                  Comment.objects.count())
+        assert all(counts), (
+            'Проверьте, что команда `import_data` загружает произведения, '
+            'отзывы и комментарии.'
+        )
+
+        output = self.import_data('--batch-size', '50')
+        assert 'добавлено 0,' in output, (
+            'Проверьте, что повторный запуск `import_data` не создаёт '
+            'уже загруженные записи.'
+        )
+        assert (Title.objects.count(), Review.objects.count(),
+                Comment.objects.count()) == counts
+        assert 'строк/с' in output
+
+    def test_02_import_genre_title(self, tmp_path):
+        from django.conf import settings
+        from reviews.models import Title
+
+        data_dir = Path(settings.BASE_DIR) / 'static' / 'data'
+        for csv_file in data_dir.glob('*.csv'):
+            shutil.copy(csv_file, tmp_path)
+        with open(tmp_path / 'genre_title.csv', 'a', encoding='utf-8') as f:
+            f.write('1000,1,9999\n1001,1,1\n')
+
+        output = self.import_data('--path', str(tmp_path))
+        assert 'пропущено с неверными ссылками: 1' in output, (
+            'Проверьте, что `import_data` пропускает связи с '
+            'несуществующими жанрами.'
+        )
+        through = Title.genre.through.objects
+        assert through.count() == 41, (
+            'Проверьте, что `import_data` загружает связи произведений и '
+            'жанров из `genre_title.csv` без повторов.'
+        )
+        assert Title.objects.get(pk=1).genre.filter(pk=1).exists()
+
+    def test_03_tables_are_scheduled_after_their_parents(self):
+        from reviews.management.commands.import_data import (
+            TABLES, build_dependencies, run_scheduled
+        )
+        from reviews.models import (
+            Category, Comment, CustomUser, Genre, Review, Title
+        )
+
+        dependencies = build_dependencies(TABLES)
+        assert dependencies[Title] == {Category}
+        assert dependencies[Title.genre.through] == {Title, Genre}
+        assert dependencies[Comment] == {CustomUser, Review}
+        roots = {model for model, deps in dependencies.items() if not deps}
+        assert roots == {CustomUser, Category, Genre}
+
+        lock = threading.Lock()
+        started, finished = [], []
+        barrier = threading.Barrier(len(roots), timeout=5)
+
+        def load(model):
+            with lock:
+                started.append(model)
+                assert dependencies[model] <= set(finished), (
+                    f'Таблица {model.__name__} загружается раньше, '
+                    'чем таблицы, на которые она ссылается.'
+                )
+            if model in roots:
+                # Независимые таблицы должны загружаться одновременно.
+                barrier.wait()
+            with lock:
+                finished.append(model)
+
+        run_scheduled(dependencies, load, workers=3)
+        assert set(finished) == set(TABLES)
+
+    def test_04_upsert_updates_only_changed_rows(self, tmp_path):
+        from django.conf import settings
+        from reviews.models import Category
+
+        data_dir = Path(settings.BASE_DIR) / 'static' / 'data'
+        for csv_file in data_dir.glob('*.csv'):
+            shutil.copy(csv_file, tmp_path)
+        self.import_data('--path', str(tmp_path))
+
+        with open(tmp_path / 'category.csv', 'w', encoding='utf-8') as f:
+            f.write('id,name,slug\n1,Кино,movie\n2,Книга,book\n4,Игра,game\n')
+        output = self.import_data('--path', str(tmp_path), '--upsert')
+
+        assert (
+            'Категории: добавлено 1, обновлено 1, без изменений 1 из 3'
+            in output
+        ), (
+            'Проверьте, что в режиме `--upsert` команда `import_data` '
+            'добавляет новые строки, обновляет изменённые и не трогает '
+            'остальные.'
+        )
+        assert 'Отзывы: добавлено 0, обновлено 0' in output
+        assert Category.objects.get(pk=1).name == 'Кино'
+        assert Category.objects.filter(slug='game').exists()
+
+        output = self.import_data('--path', str(tmp_path))
+        assert Category.objects.get(pk=1).name == 'Кино'
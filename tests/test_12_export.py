@@ -0,0 +1,114 @@
+import csv
+import json
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.asgi import get_asgi_application
+from django.core.management import call_command
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12Export:
+
+    EXPORT_URL_TEMPLATE = '/api/v1/export/{table}/'
+
+    def read(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_01_export_permissions(self, client, user_client, admin_client):
+        url = self.EXPORT_URL_TEMPLATE.format(table='titles')
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.get(url).status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что выгрузка `{self.EXPORT_URL_TEMPLATE}` доступна '
+            'только администратору.'
+        )
+        response = admin_client.get(
+            self.EXPORT_URL_TEMPLATE.format(table='unknown')
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        response = admin_client.get(url, {'file_format': 'xml'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_export_csv_and_ndjson(self, admin_client, admin):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(admin_client, titles[0]['id'], 'Класс', 9)
+
+        response = admin_client.get(
+            self.EXPORT_URL_TEMPLATE.format(table='review')
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming, (
+            'Проверьте, что выгрузка отдаётся потоком '
+            '(StreamingHttpResponse).'
+        )
+        rows = list(csv.DictReader(StringIO(self.read(response))))
+        assert list(rows[0]) == [
+            'id', 'title_id', 'text', 'author_id', 'score', 'pub_date'
+        ], 'Колонки выгрузки должны совпадать с `static/data/review.csv`.'
+        assert rows[0]['text'] == 'Класс'
+        assert rows[0]['author_id'] == str(admin.id)
+
+        response = admin_client.get(
+            self.EXPORT_URL_TEMPLATE.format(table='titles'),
+            {'file_format': 'ndjson'}
+        )
+        lines = [json.loads(line) for line in self.read(response).splitlines()]
+        assert [line['name'] for line in lines] == [
+            title['name'] for title in titles
+        ]
+
+    def test_03_export_command_round_trip(self, tmp_path, admin_client):
+        from reviews.models import Title
+
+        create_titles(admin_client)
+        call_command('export_data', '--output', str(tmp_path),
+                     stdout=StringIO())
+        assert (tmp_path / 'genre_title.csv').exists()
+
+        Title.objects.all().delete()
+        call_command('import_data', '--path', str(tmp_path), stdout=StringIO())
+        assert Title.objects.count() == 2, (
+            'Проверьте, что выгрузку `export_data` можно загрузить обратно '
+            'командой `import_data`.'
+        )
+        assert Title.genre.through.objects.count() == 3
+
+    def test_04_export_asgi(self, admin_client, token_admin):
+        titles, _, _ = create_titles(admin_client)
+        url = self.EXPORT_URL_TEMPLATE.format(table='titles')
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': url,
+            'raw_path': url.encode(),
+            'query_string': b'file_format=ndjson',
+            'root_path': '',
+            'headers': [
+                (b'host', b'localhost'),
+                (b'authorization', f'Bearer {token_admin["access"]}'.encode()),
+            ],
+            'client': ('127.0.0.1', 0),
+            'server': ('localhost', 80),
+        }
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            messages.append(message)
+
+        async_to_sync(get_asgi_application())(scope, receive, send)
+        assert messages[0]['status'] == HTTPStatus.OK
+        body = b''.join(message.get('body', b'') for message in messages[1:])
+        lines = [json.loads(line) for line in body.decode().splitlines()]
+        assert [line['name'] for line in lines] == [
+            title['name'] for title in titles
+        ], 'Проверьте, что выгрузка работает под ASGI.'
@@ -0,0 +1,53 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13CatalogueCache:
+
+    TITLES_URL = '/api/v1/titles/'
+    STATS_URL = '/api/v1/_debug/cache/'
+
+    def test_01_list_is_cached_until_catalogue_changes(self, client,
+                                                      admin_client):
+        titles, _, _ = create_titles(admin_client)
+
+        response = client.get(self.TITLES_URL, {'year': 1984, 'genre': ''})
+        assert response['X-Cache'] == 'MISS'
+        response = client.get(self.TITLES_URL, {'genre': '', 'year': 1984})
+        assert response['X-Cache'] == 'HIT', (
+            'Проверьте, что повторный GET-запрос к списку произведений с теми '
+            'же параметрами (в любом порядке) отдаётся из кеша.'
+        )
+        assert response.json()['results'][0]['rating'] is None
+
+        create_single_review(admin_client, titles[0]['id'], 'Класс', 9)
+        response = client.get(self.TITLES_URL, {'year': 1984, 'genre': ''})
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что кеш каталога сбрасывается при добавлении отзыва.'
+        )
+        assert response.json()['results'][0]['rating'] == 9
+
+        assert client.get('/api/v1/genres/')['X-Cache'] == 'MISS'
+        assert client.get('/api/v1/genres/')['X-Cache'] == 'HIT'
+        admin_client.post('/api/v1/genres/', data={'name': 'Н', 'slug': 'n'})
+        response = client.get('/api/v1/genres/')
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['count'] == 4
+
+    def test_02_cache_stats(self, client, user_client, admin_client):
+        assert client.get(self.STATS_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        )
+        assert user_client.get(self.STATS_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+        before = admin_client.get(self.STATS_URL).json()
+        client.get('/api/v1/categories/')
+        client.get('/api/v1/categories/')
+        after = admin_client.get(self.STATS_URL).json()
+        assert after['misses'] - before['misses'] == 1
+        assert after['hits'] - before['hits'] == 1
@@ -0,0 +1,143 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import (
+    create_single_comment, create_single_review, create_titles
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ConditionalGet:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def assert_revalidates(self, client, url, change):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        etag = response.get('ETag')
+        assert etag and response.get('Last-Modified'), (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'заголовки `ETag` и `Last-Modified`.'
+        )
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным '
+            '`If-None-Match` возвращает ответ со статусом 304.'
+        )
+        assert not response.content
+
+        change()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что после изменения данных GET-запрос к `{url}` '
+            'со старым `If-None-Match` возвращает ответ со статусом 200.'
+        )
+        assert response['ETag'] != etag
+
+    def test_01_title_detail(self, client, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        self.assert_revalidates(
+            client, self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id),
+            lambda: create_single_review(user_client, title_id, 'Ну', 3)
+        )
+
+    def test_02_reviews_and_comments(self, client, admin_client,
+                                     user_client, user):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review = create_single_review(admin_client, title_id, 'Да', 8).json()
+        self.assert_revalidates(
+            client, self.REVIEWS_URL_TEMPLATE.format(title_id=title_id),
+            lambda: create_single_review(user_client, title_id, 'Нет', 2)
+        )
+        comments_url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title_id, review_id=review['id']
+        )
+        create_single_comment(user_client, title_id, review['id'], 'А')
+
+        def rename_author():
+            user.username = 'renamed'
+            user.save()
+
+        self.assert_revalidates(client, comments_url, rename_author)
+        assert client.get(comments_url).json()['results'][0]['author'] == (
+            'renamed'
+        )
+
+    def test_03_reviews_of_other_title_do_not_change_etag(self, client,
+                                                          admin_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(admin_client, titles[0]['id'], 'Да', 8)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        etag = client.get(url)['ETag']
+        create_single_review(admin_client, titles[1]['id'], 'Да', 8)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_04_comment_changes_review_etag(self, client, admin_client,
+                                            user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review = create_single_review(admin_client, title_id, 'Да', 8).json()
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+        self.assert_revalidates(
+            client, url,
+            lambda: create_single_comment(
+                user_client, title_id, review['id'], 'А'
+            )
+        )
+        response = client.get(f'{url}{review["id"]}/')
+        assert response.json()['comments_count'] == 1, (
+            'Проверьте, что после комментария отзыв отдаётся с новым '
+            'числом комментариев.'
+        )
+
+    def test_05_writes_change_only_their_scopes(self, client, admin_client,
+                                                user_client, user):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review = create_single_review(admin_client, title_id, 'Да', 8).json()
+        urls = (
+            '/api/v1/categories/',
+            '/api/v1/genres/',
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[1]['id']),
+        )
+        etags = [client.get(url)['ETag'] for url in urls]
+        create_single_review(user_client, title_id, 'Нет', 2)
+        for url, etag in zip(urls, etags):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'Проверьте, что отзыв не меняет ETag `{url}`.'
+            )
+
+        reviews_url = self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+        comments_url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title_id, review_id=review['id']
+        )
+        create_single_comment(user_client, title_id, review['id'], 'А')
+        etags = [client.get(url)['ETag'] for url in (reviews_url, comments_url)]
+        me_etag = user_client.get('/api/v1/users/me/')['ETag']
+        response = admin_client.patch(
+            '/api/v1/users/me/', data={'bio': 'Люблю кино'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        for url, etag in zip((reviews_url, comments_url), etags):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                'Проверьте, что изменение пользователя без смены имени не '
+                f'меняет ETag `{url}`.'
+            )
+        response = user_client.get(
+            '/api/v1/users/me/', HTTP_IF_NONE_MATCH=me_etag
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что изменение другого пользователя не меняет ETag '
+            '`/api/v1/users/me/`.'
+        )
@@ -0,0 +1,47 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15CachedAuthentication:
+
+    def user_queries(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        return [
+            query['sql'] for query in context.captured_queries
+            if 'reviews_customuser' in query['sql']
+        ]
+
+    def test_01_authenticated_get_without_user_query(self, user_client):
+        self.user_queries(user_client, '/api/v1/categories/')
+        assert self.user_queries(user_client, '/api/v1/categories/') == [], (
+            'Проверьте, что аутентифицированный GET-запрос не читает '
+            'пользователя из БД, если он уже есть в кеше.'
+        )
+
+    def test_02_role_change_invalidates_cache(self, admin_client, user,
+                                              user_client):
+        url = '/api/v1/users/'
+        assert user_client.get(url).status_code == HTTPStatus.FORBIDDEN
+
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert user_client.get(url).status_code == HTTPStatus.OK, (
+            'Проверьте, что кеш пользователя сбрасывается при изменении '
+            'его роли.'
+        )
+
+    def test_03_users_me_reads_full_record(self, user_client, user):
+        response = user_client.get('/api/v1/users/me/')
+        assert response.json()['bio'] == user.bio
+        response = user_client.patch(
+            '/api/v1/users/me/', data={'first_name': 'Имя'}
+        )
+        assert response.json()['first_name'] == 'Имя'
@@ -0,0 +1,128 @@
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16Outbox:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    @pytest.fixture(autouse=True)
+    def queued_mail(self, settings):
+        settings.EMAIL_OUTBOX_EAGER = False
+
+    def signup(self, client, number):
+        return client.post(self.URL_SIGNUP, data={
+            'email': f'user{number}@yamdb.fake',
+            'username': f'user{number}',
+        })
+
+    def test_01_signup_enqueues_mail(self, client):
+        from reviews.models import OutboxEmail
+
+        outbox_before_count = len(mail.outbox)
+        assert self.signup(client, 1).status_code == 200
+        assert len(mail.outbox) == outbox_before_count, (
+            'Проверьте, что при регистрации письмо не отправляется в запросе, '
+            'а записывается в очередь.'
+        )
+        message = OutboxEmail.objects.get()
+        assert message.to == ['user1@yamdb.fake']
+        assert message.sent_at is None
+
+        call_command('send_outbox', stdout=StringIO())
+        assert len(mail.outbox) == outbox_before_count + 1, (
+            'Проверьте, что команда `send_outbox` отправляет письма из '
+            'очереди.'
+        )
+        assert mail.outbox[-1].to == ['user1@yamdb.fake']
+        message.refresh_from_db()
+        assert message.sent_at is not None
+
+        call_command('send_outbox', stdout=StringIO())
+        assert len(mail.outbox) == outbox_before_count + 1, (
+            'Проверьте, что отправленное письмо не отправляется повторно.'
+        )
+
+    def test_02_batch_uses_one_connection(self, client, monkeypatch):
+        from reviews import outbox
+
+        for number in range(3):
+            self.signup(client, number)
+        connections = []
+
+        def get_connection():
+            connection = mail.get_connection()
+            connections.append(connection)
+            return connection
+
+        monkeypatch.setattr(outbox, 'get_connection', get_connection)
+        assert outbox.send_queued() == {'sent': 3}
+        assert len(connections) == 1, (
+            'Проверьте, что пачка писем отправляется через одно соединение.'
+        )
+
+    def test_03_failed_mail_is_retried(self, client, monkeypatch):
+        from reviews import outbox
+        from reviews.models import OutboxEmail
+
+        self.signup(client, 1)
+
+        def send(self):
+            raise ConnectionError('SMTP недоступен')
+
+        with monkeypatch.context() as patch:
+            patch.setattr(outbox.EmailMessage, 'send', send)
+            assert outbox.send_queued() == {'failed': 1}
+        message = OutboxEmail.objects.get()
+        assert message.attempts == 1
+        assert 'SMTP недоступен' in message.last_error
+        assert message.next_attempt > timezone.now(), (
+            'Проверьте, что повторная отправка откладывается.'
+        )
+        assert not outbox.send_queued()
+
+        OutboxEmail.objects.update(next_attempt=timezone.now())
+        assert outbox.send_queued() == {'sent': 1}
+        assert OutboxEmail.objects.filter(sent_at__isnull=False).exists()
+
+    def test_04_eager_only_for_local_backends(self, settings):
+        from reviews import outbox
+
+        settings.EMAIL_OUTBOX_EAGER = None
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        assert outbox.is_eager()
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+        assert not outbox.is_eager(), (
+            'Проверьте, что по умолчанию письма для SMTP отправляются '
+            'командой `send_outbox`, а не сразу.'
+        )
+        settings.EMAIL_OUTBOX_EAGER = True
+        assert outbox.is_eager()
+
+    def test_05_send_outside_transaction(self, client, monkeypatch):
+        from django.db import connection
+
+        from reviews import outbox
+
+        self.signup(client, 1)
+        send = outbox.EmailMessage.send
+        concurrent = []
+
+        def send_checked(self):
+            assert not connection.in_atomic_block, (
+                'Проверьте, что письма отправляются без открытой транзакции.'
+            )
+            concurrent.append(outbox.send_queued())
+            return send(self)
+
+        monkeypatch.setattr(outbox.EmailMessage, 'send', send_checked)
+        assert outbox.send_queued() == {'sent': 1}
+        assert concurrent == [{}], (
+            'Проверьте, что письмо, которое уже отправляется, не забирает '
+            'параллельный запуск `send_queued`.'
+        )
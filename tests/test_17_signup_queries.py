@@ -0,0 +1,49 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17SignupQueries:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    @pytest.fixture(autouse=True)
+    def queued_mail(self, settings):
+        settings.EMAIL_OUTBOX_EAGER = False
+
+    def test_01_validate_runs_one_query(self, django_assert_num_queries,
+                                        django_user_model):
+        from api.serializers import UserRegistrationSerializer
+
+        user = django_user_model.objects.create_user(
+            username='first', email='first@yamdb.fake'
+        )
+        serializer = UserRegistrationSerializer(
+            data={'username': 'first', 'email': 'first@yamdb.fake'}
+        )
+        with django_assert_num_queries(1):
+            assert serializer.is_valid()
+        assert serializer.existing_user == user
+
+        serializer = UserRegistrationSerializer(
+            data={'username': 'second', 'email': 'first@yamdb.fake'}
+        )
+        with django_assert_num_queries(1):
+            assert not serializer.is_valid()
+        assert 'email' in serializer.errors
+
+    def test_02_repeated_signup_queries(self, client, django_user_model,
+                                        django_assert_num_queries):
+        data = {'username': 'first', 'email': 'first@yamdb.fake'}
+        response = client.post(self.URL_SIGNUP, data=data)
+        assert response.status_code == HTTPStatus.OK
+        assert not django_user_model.objects.get(username='first').is_active
+
+        # Поиск пользователя и запись письма в очередь.
+        with django_assert_num_queries(2):
+            response = client.post(self.URL_SIGNUP, data=data)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что повторная регистрация не читает пользователя '
+            'из БД повторно.'
+        )
@@ -0,0 +1,84 @@
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18QueryProfiler:
+
+    STATS_URL = '/api/v1/_debug/queries/'
+
+    @pytest.fixture(autouse=True)
+    def profiler(self, settings):
+        from api import profiler
+
+        settings.QUERY_PROFILER_ENABLED = True
+        settings.QUERY_BUDGETS = {}
+        profiler.reset_stats()
+        yield profiler
+        profiler.reset_stats()
+
+    def test_01_headers_and_summary(self, client, user_client, admin_client,
+                                    profiler):
+        create_titles(admin_client)
+        profiler.reset_stats()
+
+        response = client.get('/api/v1/titles/')
+        assert int(response['X-Query-Count']) > 0, (
+            'Проверьте, что ответ содержит заголовок `X-Query-Count` с '
+            'количеством SQL-запросов.'
+        )
+        assert float(response['X-Query-Time']) >= 0
+
+        assert client.get(self.STATS_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        )
+        assert user_client.get(self.STATS_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+        stats = admin_client.get(self.STATS_URL).json()
+        assert stats['enabled']
+        titles = stats['endpoints']['titles-list']
+        assert titles['requests'] == 1
+        assert titles['queries'] == int(response['X-Query-Count'])
+        assert titles['slowest'][0]['sql']
+
+        response = admin_client.delete(self.STATS_URL)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        stats = admin_client.get(self.STATS_URL).json()
+        assert 'titles-list' not in stats['endpoints']
+
+    def test_02_budget(self, client, settings, caplog):
+        from api.profiler import QueryBudgetExceeded
+
+        settings.QUERY_BUDGETS = {'genres-list': 0}
+        client.get('/api/v1/genres/')
+        assert 'genres-list' in caplog.text, (
+            'Проверьте, что превышение лимита запросов пишется в лог.'
+        )
+
+        settings.QUERY_BUDGET_RAISE = True
+        with pytest.raises(QueryBudgetExceeded):
+            client.get('/api/v1/genres/', {'page': 1})
+
+    def test_03_disabled(self, client, settings):
+        settings.QUERY_PROFILER_ENABLED = False
+        assert 'X-Query-Count' not in client.get('/api/v1/genres/')
+
+    def test_04_asgi(self, admin_client, settings, profiler):
+        create_titles(admin_client)
+        profiler.reset_stats()
+        # Список произведений — асинхронное представление каталога.
+        settings.ROOT_URLCONF = 'tests.test_29_async_catalogue'
+
+        response = async_to_sync(AsyncClient().get)('/api/v1/titles/')
+        assert response.status_code == HTTPStatus.OK
+        assert int(response['X-Query-Count']) > 0, (
+            'Проверьте, что профилировщик считает SQL-запросы и под ASGI.'
+        )
+        stats = profiler.get_stats()['titles-list']
+        assert stats['queries'] == int(response['X-Query-Count'])
@@ -0,0 +1,72 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19Benchmark:
+
+    SIZES = (
+        '--users', '20', '--titles', '30', '--reviews', '150',
+        '--comments', '40', '--genres', '5', '--categories', '3',
+    )
+
+    def generate(self, prefix, seed=1):
+        call_command(
+            'generate_fake_data', *self.SIZES, '--seed', str(seed),
+            '--prefix', prefix, stdout=StringIO()
+        )
+
+    def test_01_generate_fake_data(self):
+        from reviews.models import Comment, CustomUser, Review, Title
+
+        self.generate('first')
+        assert CustomUser.objects.count() == 20
+        assert Title.objects.count() == 30
+        assert Comment.objects.count() == 40
+        assert 0 < Review.objects.count() <= 150
+        assert Title.objects.filter(rating__isnull=False).exists(), (
+            'Проверьте, что `generate_fake_data` пересчитывает рейтинг.'
+        )
+        first = list(Title.objects.order_by('pk').values_list(
+            'name', 'year', 'rating_count'))
+
+        self.generate('second')
+        second = list(Title.objects.order_by('pk').values_list(
+            'name', 'year', 'rating_count'))[30:]
+        assert first == second, (
+            'Проверьте, что `generate_fake_data` с тем же `--seed` создаёт '
+            'те же данные.'
+        )
+
+    def test_02_benchmark_and_compare(self, tmp_path):
+        self.generate('bench')
+        baseline = tmp_path / 'baseline.json'
+        call_command(
+            'benchmark', '--requests', '2', '--output', str(baseline),
+            stdout=StringIO()
+        )
+        result = json.loads(baseline.read_text(encoding='utf-8'))
+        assert result['endpoints']['titles']['p95_ms'] > 0
+        assert {'titles-rating', 'titles-ratings'} <= set(
+            result['endpoints']
+        ), 'Проверьте, что бенчмарк обходит все GET-эндпоинты api/urls.py.'
+        assert all(
+            stats['status'] == 200 for stats in result['endpoints'].values()
+        ), 'Проверьте, что бенчмарк обходит эндпоинты без ошибок.'
+
+        call_command(
+            'benchmark', '--load', str(baseline), '--compare', str(baseline),
+            stdout=StringIO()
+        )
+
+        result['endpoints']['reviews']['queries'] -= 1
+        regressed = tmp_path / 'regressed.json'
+        regressed.write_text(json.dumps(result), encoding='utf-8')
+        with pytest.raises(CommandError, match='reviews'):
+            call_command(
+                'benchmark', '--load', str(baseline),
+                '--compare', str(regressed), stdout=StringIO()
+            )
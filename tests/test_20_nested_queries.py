@@ -0,0 +1,87 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_reviews, create_titles
+
+
+def parent_selects(context, table):
+    return [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith('SELECT')
+        and f'FROM "{table}"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20NestedQueries:
+
+    REVIEWS_URL = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL = '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+
+    def test_01_list_does_not_read_parent(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL.format(title_id=titles[0]['id'])
+        admin_client.post(url, data={'text': 'Отзыв', 'score': 5})
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == 1
+        assert not parent_selects(context, 'reviews_title'), (
+            'Проверьте, что список отзывов не читает произведение отдельным '
+            'запросом.'
+        )
+
+        response = client.get(self.REVIEWS_URL.format(title_id=titles[1]['id']))
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['results'] == []
+        response = client.get(self.REVIEWS_URL.format(title_id=999))
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что для несуществующего произведения список отзывов '
+            'возвращает 404.'
+        )
+
+    def test_02_create_reads_parent_once(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL.format(title_id=titles[0]['id'])
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'Да', 'score': 7})
+        assert response.status_code == HTTPStatus.CREATED
+        assert len(parent_selects(context, 'reviews_title')) == 1, (
+            'Проверьте, что при создании отзыва произведение читается из БД '
+            'один раз.'
+        )
+        response = user_client.post(
+            self.REVIEWS_URL.format(title_id=999),
+            data={'text': 'Да', 'score': 7}
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_03_comments(self, client, admin_client, user_client, admin):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        url = self.COMMENTS_URL.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'Согласен'})
+        assert response.status_code == HTTPStatus.CREATED
+        assert len(parent_selects(context, 'reviews_review')) == 1
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.json()['count'] == 1
+        assert not parent_selects(context, 'reviews_review')
+
+        wrong_title = self.COMMENTS_URL.format(
+            title_id=titles[1]['id'], review_id=reviews[0]['id']
+        )
+        assert client.get(wrong_title).status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что комментарии к отзыву другого произведения '
+            'недоступны.'
+        )
+        assert user_client.post(
+            wrong_title, data={'text': 'Нет'}
+        ).status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,55 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21AuthorQueries:
+
+    REVIEWS_URL = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL = '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+
+    def count_queries(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200
+        return len(context)
+
+    def test_01_constant_queries(self, client, django_user_model):
+        from reviews.models import Category, Comment, Review, Title
+
+        title = Title.objects.create(
+            name='Чапаев', year=1934,
+            category=Category.objects.create(name='Фильм', slug='movie'),
+        )
+        authors = [
+            django_user_model.objects.create_user(
+                username=f'author{number}', email=f'a{number}@yamdb.fake'
+            )
+            for number in range(6)
+        ]
+        review = Review.objects.create(
+            title=title, author=authors[0], text='Отзыв', score=5
+        )
+        Comment.objects.create(review=review, author=authors[0], text='Да')
+        reviews_url = self.REVIEWS_URL.format(title_id=title.id)
+        comments_url = self.COMMENTS_URL.format(
+            title_id=title.id, review_id=review.id
+        )
+        reviews_queries = self.count_queries(client, reviews_url)
+        comments_queries = self.count_queries(client, comments_url)
+
+        for author in authors[1:]:
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=5
+            )
+            Comment.objects.create(review=review, author=author, text='Да')
+
+        assert self.count_queries(client, reviews_url) == reviews_queries, (
+            'Проверьте, что число запросов к списку отзывов не зависит от '
+            'количества отзывов на странице.'
+        )
+        assert self.count_queries(client, comments_url) == comments_queries, (
+            'Проверьте, что число запросов к списку комментариев не зависит '
+            'от количества комментариев на странице.'
+        )
@@ -0,0 +1,50 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import (
+    create_single_comment, create_single_review, create_titles
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22Counts:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL = '/api/v1/titles/{title_id}/reviews/'
+
+    def test_01_reviews_and_comments_count(self, client, admin_client,
+                                           user_client):
+        titles, _, _ = create_titles(admin_client)
+        review = create_single_review(
+            admin_client, titles[0]['id'], 'Отлично', 9
+        ).json()
+        assert review['comments_count'] == 0
+        create_single_review(user_client, titles[0]['id'], 'Неплохо', 6)
+        for text in ('Согласен', 'Нет'):
+            create_single_comment(
+                user_client, titles[0]['id'], review['id'], text
+            )
+
+        counts = {
+            title['id']: title['reviews_count']
+            for title in client.get(self.TITLES_URL).json()['results']
+        }
+        assert counts == {titles[0]['id']: 2, titles[1]['id']: 0}, (
+            'Проверьте, что список произведений содержит поле '
+            '`reviews_count` с количеством отзывов.'
+        )
+        response = client.get(f'{self.TITLES_URL}{titles[0]["id"]}/')
+        assert response.json()['reviews_count'] == 2
+
+        response = client.get(self.REVIEWS_URL.format(title_id=titles[0]['id']))
+        assert response.status_code == HTTPStatus.OK
+        counts = {
+            item['id']: item['comments_count']
+            for item in response.json()['results']
+        }
+        assert counts[review['id']] == 2, (
+            'Проверьте, что список отзывов содержит поле `comments_count` с '
+            'количеством комментариев.'
+        )
+        assert sorted(counts.values()) == [0, 2]
@@ -0,0 +1,155 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import (
+    create_single_review, create_titles, migrate_reviews
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23RatingHistogram:
+
+    RATING_URL = '/api/v1/titles/{title_id}/rating/'
+    BATCH_URL = '/api/v1/titles/rating/'
+
+    def test_01_histogram_follows_reviews(self, client, admin_client,
+                                          user_client, moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        url = self.RATING_URL.format(title_id=title_id)
+
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что эндпоинт `{self.RATING_URL}` доступен '
+            'без токена.'
+        )
+        assert response.json() == {
+            'title': title_id, 'count': 0, 'mean': None, 'median': None,
+            'histogram': {str(score): 0 for score in range(1, 11)},
+        }
+
+        review = create_single_review(admin_client, title_id, 'А', 9).json()
+        create_single_review(user_client, title_id, 'Б', 4)
+        create_single_review(moderator_client, title_id, 'В', 4)
+        data = client.get(url).json()
+        assert data['count'] == 3
+        assert data['mean'] == pytest.approx(17 / 3)
+        assert data['median'] == 4
+        assert data['histogram']['4'] == 2 and data['histogram']['9'] == 1
+
+        admin_client.patch(
+            f'/api/v1/titles/{title_id}/reviews/{review["id"]}/',
+            data={'score': 10}
+        )
+        data = client.get(url).json()
+        assert (data['histogram']['9'], data['histogram']['10']) == (0, 1), (
+            'Проверьте, что гистограмма обновляется при изменении оценки.'
+        )
+        admin_client.delete(
+            f'/api/v1/titles/{title_id}/reviews/{review["id"]}/'
+        )
+        data = client.get(url).json()
+        assert (data['count'], data['median']) == (2, 4)
+        assert data['histogram']['10'] == 0
+
+        with CaptureQueriesContext(connection) as context:
+            client.get(url)
+        assert not [
+            query for query in context.captured_queries
+            if 'reviews_review' in query['sql']
+        ], 'Проверьте, что гистограмма не читает отзывы.'
+
+        assert client.get(
+            self.RATING_URL.format(title_id=999)
+        ).status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_batch_and_rebuild(self, client, admin_client, user_client):
+        from reviews.models import RatingBucket
+
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(admin_client, titles[0]['id'], 'А', 7)
+        create_single_review(user_client, titles[0]['id'], 'Б', 8)
+
+        response = client.get(
+            self.BATCH_URL, {'ids': f'{titles[1]["id"]},{titles[0]["id"]},999'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        data = {item['title']: item for item in response.json()}
+        assert set(data) == {titles[0]['id'], titles[1]['id']}, (
+            'Проверьте, что `?ids=` возвращает распределения только '
+            'существующих произведений.'
+        )
+        assert data[titles[0]['id']]['median'] == 7.5
+        assert data[titles[1]['id']]['count'] == 0
+        assert client.get(
+            self.BATCH_URL, {'ids': 'a,b'}
+        ).status_code == HTTPStatus.BAD_REQUEST
+
+        RatingBucket.objects.all().delete()
+        call_command('recalculate_ratings', stdout=StringIO())
+        response = client.get(self.RATING_URL.format(title_id=titles[0]['id']))
+        assert response.json()['count'] == 2, (
+            'Проверьте, что `recalculate_ratings` пересобирает распределение '
+            'оценок.'
+        )
+
+    def test_03_histogram_follows_cascade_delete(self, client, admin_client,
+                                                 user_client, user):
+        from reviews.models import RatingBucket, Title
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        url = self.RATING_URL.format(title_id=title_id)
+        create_single_review(admin_client, title_id, 'А', 9)
+        create_single_review(user_client, title_id, 'Б', 4)
+
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        data = client.get(url).json()
+        assert (data['count'], data['histogram']['4']) == (1, 0), (
+            'Проверьте, что гистограмма обновляется, когда отзыв удаляется '
+            'вместе с автором.'
+        )
+        response = client.get(f'/api/v1/titles/{title_id}/')
+        assert response.json()['reviews_count'] == 1
+
+        review = Title.objects.get(pk=title_id).reviews.get()
+        review.score = 6
+        review.save()
+        data = client.get(url).json()
+        assert data['histogram']['6'] == 1 and data['count'] == 1, (
+            'Проверьте, что гистограмма обновляется при изменении отзыва '
+            'через ORM.'
+        )
+
+        Title.objects.filter(pk=title_id).delete()
+        assert not RatingBucket.objects.filter(title_id=title_id).exists()
+
+    def test_04_migration_backfills_histogram(self, client, user_client):
+        apps = migrate_reviews('0005_outboxemail')
+        try:
+            author = apps.get_model('reviews', 'CustomUser').objects.create(
+                username='old', email='old@yamdb.fake'
+            )
+            title = apps.get_model('reviews', 'Title').objects.create(
+                name='Старое', year=1990
+            )
+            apps.get_model('reviews', 'Review').objects.create(
+                title=title, author=author, text='Отзыв', score=3
+            )
+        finally:
+            migrate_reviews()
+
+        url = self.RATING_URL.format(title_id=title.pk)
+        data = client.get(url).json()
+        assert (data['count'], data['histogram']['3']) == (1, 1), (
+            'Проверьте, что миграция заполняет распределение оценок уже '
+            'существующих отзывов.'
+        )
+        create_single_review(user_client, title.pk, 'Новый', 3)
+        assert client.get(url).json()['histogram']['3'] == 2
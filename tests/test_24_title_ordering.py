@@ -0,0 +1,131 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import migrate_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24TitleOrdering:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def titles(self):
+        from reviews.models import Title
+
+        titles = [
+            Title.objects.create(name=f'Произведение {number:02}', year=2000)
+            for number in range(25)
+        ]
+        # Каждое третье произведение без оценок.
+        for number, title in enumerate(titles):
+            if number % 3:
+                Title.objects.filter(pk=title.pk).update_rating(
+                    number % 10 + 1, 1
+                )
+        return titles
+
+    def names(self, response):
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()['results']]
+
+    def walk(self, client, params):
+        names, url = [], self.TITLES_URL
+        while url:
+            response = client.get(url, params)
+            names += self.names(response)
+            url, params = response.json()['next'], None
+        return names, response
+
+    def test_01_ordering_by_rating(self, client, titles):
+        from reviews.models import Title
+
+        ratings = sorted(Title.objects.filter(
+            rating__isnull=False).values_list('rating', flat=True))
+        unrated = Title.objects.filter(rating__isnull=True).count()
+        for ordering, expected in (
+            ('-rating', ratings[::-1] + [None] * unrated),
+            ('rating', ratings + [None] * unrated),
+        ):
+            names, _ = self.walk(client, {'ordering': ordering})
+            by_name = dict(Title.objects.values_list('name', 'rating'))
+            assert [by_name[name] for name in names] == expected, (
+                f'Проверьте, что `?ordering={ordering}` сортирует '
+                'произведения по рейтингу, а произведения без оценок идут '
+                'в конце списка.'
+            )
+
+    def test_02_keyset_matches_page_numbers(self, client, titles):
+        for ordering in ('-rating', 'rating', 'name', '-reviews_count'):
+            pages, _ = self.walk(client, {'ordering': ordering})
+            cursor, response = self.walk(
+                client, {'ordering': ordering, 'cursor': ''}
+            )
+            assert cursor == pages, (
+                f'Проверьте, что `?ordering={ordering}` с пагинацией по '
+                'курсору выдаёт те же произведения в том же порядке.'
+            )
+            last_page = len(self.names(response))
+            backwards = []
+            url = response.json()['previous']
+            while url:
+                response = client.get(url)
+                backwards = self.names(response) + backwards
+                url = response.json()['previous']
+            assert backwards == cursor[:-last_page], (
+                f'Проверьте, что с `?ordering={ordering}` ссылки `previous` '
+                'возвращают предыдущие страницы.'
+            )
+
+    def test_03_weighted_rating(self, client):
+        from reviews.models import Title
+
+        lucky = Title.objects.create(name='Одна десятка', year=2000)
+        Title.objects.filter(pk=lucky.pk).update_rating(10, 1)
+        popular = Title.objects.create(name='Много восьмёрок', year=2000)
+        Title.objects.filter(pk=popular.pk).update_rating(80, 10)
+        unrated = Title.objects.create(name='Без оценок', year=2000)
+
+        response = client.get(self.TITLES_URL, {'ordering': '-rating'})
+        assert self.names(response)[0] == lucky.name
+        response = client.get(
+            self.TITLES_URL, {'ordering': '-weighted_rating'}
+        )
+        assert self.names(response) == [
+            popular.name, lucky.name, unrated.name
+        ], (
+            'Проверьте, что взвешенный рейтинг ставит произведение с '
+            'множеством хороших оценок выше произведения с одной оценкой.'
+        )
+        data = {
+            title['name']: title['weighted_rating']
+            for title in response.json()['results']
+        }
+        assert data[lucky.name] == pytest.approx((10 + 5 * 7) / 6)
+        assert data[unrated.name] == 7
+
+    def test_04_invalid_ordering_is_ignored(self, client, titles):
+        response = client.get(self.TITLES_URL, {'ordering': 'description'})
+        assert response.status_code == HTTPStatus.OK
+
+    def test_05_migration_backfills_weighted_rating(self, settings):
+        from reviews.models import Title
+
+        apps = migrate_reviews('0006_ratingbucket')
+        try:
+            title = apps.get_model('reviews', 'Title').objects.create(
+                name='Старое', year=1990, rating_sum=30, rating_count=3,
+                rating=10.0,
+            )
+        finally:
+            migrate_reviews()
+
+        weight = settings.RATING_PRIOR_WEIGHT
+        expected = (30 + weight * settings.RATING_PRIOR_MEAN) / (3 + weight)
+        assert Title.objects.get(pk=title.pk).weighted_rating == (
+            pytest.approx(expected)
+        ), (
+            'Проверьте, что миграция считает взвешенный рейтинг уже '
+            'оценённых произведений.'
+        )
@@ -0,0 +1,61 @@
+import re
+
+import pytest
+from django.db import connection
+
+
+def full_scans(queryset):
+    """Таблицы, которые план запроса читает целиком, и сортировки."""
+    plan = queryset.explain()
+    return [
+        line for line in plan.splitlines()
+        if re.search(r'SCAN \w+$', line) or 'TEMP B-TREE' in line
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='План запроса в формате SQLite.'
+)
+class Test25Indexes:
+
+    def hot_queries(self):
+        from reviews.models import Comment, Review, Title
+
+        reviews = Review.objects.filter(title_id=1).select_related('author')
+        comments = Comment.objects.filter(
+            review_id=1, review__title_id=1
+        ).select_related('author')
+        return {
+            'список отзывов': reviews.with_comments_count()[:10],
+            'отзывы по курсору': reviews.filter(
+                pub_date__lt='2020-01-01T00:00:00Z'
+            ).order_by('-pub_date', '-pk')[:10],
+            'список комментариев': comments[:10],
+            'комментарии по курсору': comments.order_by('pub_date', 'pk')[:10],
+            'список произведений': Title.objects.all()[:10],
+            'произведения по курсору': Title.objects.filter(
+                year__gt=2000).order_by('year', 'pk')[:10],
+            'фильтр по году': Title.objects.filter(year=2000)[:10],
+            'фильтр по категории': Title.objects.filter(
+                category__slug='movie')[:10],
+            'лучшие произведения': Title.objects.order_by(
+                '-weighted_rating', '-pk')[:10],
+        }
+
+    def test_01_hot_queries_use_indexes(self):
+        for name, queryset in self.hot_queries().items():
+            assert not full_scans(queryset), (
+                f'Запрос «{name}» читает таблицу целиком или сортирует '
+                f'результат без индекса:\n{queryset.explain()}'
+            )
+
+    def test_02_filters_do_not_scan(self):
+        from reviews.models import Title
+
+        for queryset in (
+            Title.objects.filter(genre__slug='drama'),
+            Title.objects.filter(name='Чапаев'),
+        ):
+            plan = queryset.explain()
+            assert not re.search(r'SCAN \w+$', plan, re.MULTILINE), plan
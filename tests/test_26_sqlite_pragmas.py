@@ -0,0 +1,51 @@
+import pytest
+from django.db import connection
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='Проверяются PRAGMA SQLite.'
+)
+class Test26SqlitePragmas:
+
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_01_connection_is_configured(self):
+        # Тестовая БД в памяти живёт одним соединением, настроенным при
+        # открытии, поэтому PRAGMA проверяются на нём.
+        assert self.pragma('busy_timeout') == 5000, (
+            'Проверьте, что соединение с SQLite получает `busy_timeout` из '
+            '`SQLITE_PRAGMAS`.'
+        )
+        assert self.pragma('cache_size') == -20000
+        assert self.pragma('synchronous') == 1, (
+            'Проверьте, что соединение получает `synchronous=NORMAL`.'
+        )
+        assert self.pragma('temp_store') == 2
+
+    def reconnect(self):
+        from django.db.backends.signals import connection_created
+
+        connection_created.send(
+            sender=connection.__class__, connection=connection
+        )
+
+    def test_02_pragmas_follow_settings(self, settings):
+        busy_timeout = settings.SQLITE_PRAGMAS['busy_timeout']
+        settings.SQLITE_PRAGMAS = {'busy_timeout': 1234}
+        self.reconnect()
+        assert self.pragma('busy_timeout') == 1234, (
+            'Проверьте, что PRAGMA берутся из `SQLITE_PRAGMAS` при создании '
+            'соединения.'
+        )
+        settings.SQLITE_PRAGMAS = {}
+        self.reconnect()
+        assert self.pragma('busy_timeout') == 1234, (
+            'Проверьте, что пустой `SQLITE_PRAGMAS` не меняет настройки '
+            'соединения.'
+        )
+        settings.SQLITE_PRAGMAS = {'busy_timeout': busy_timeout}
+        self.reconnect()
@@ -0,0 +1,131 @@
+import sqlite3
+from http import HTTPStatus
+
+import pytest
+from django.db import connection, connections
+
+from tests.utils import create_titles
+
+REPLICA = 'replica'
+
+
+@pytest.fixture
+def replica(settings, tmp_path):
+    """
+    Реплика — файл SQLite, который синхронизируется с основной тестовой
+    БД только по вызову sync(): между вызовами она отстаёт, как реплика
+    с задержкой репликации.
+    """
+    path = tmp_path / 'replica.sqlite3'
+    connections.settings[REPLICA] = {
+        'ENGINE': 'django.db.backends.sqlite3', 'NAME': str(path),
+    }
+    settings.DATABASE_REPLICAS = [REPLICA]
+
+    def sync():
+        connections[REPLICA].close()
+        connection.ensure_connection()
+        target = sqlite3.connect(path)
+        connection.connection.backup(target)
+        target.close()
+
+    sync()
+    yield sync
+    connections[REPLICA].close()
+    delattr(connections._connections, REPLICA)
+    del connections.settings[REPLICA]
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='Реплика — копия файла SQLite.'
+)
+class Test27Replicas:
+
+    REVIEWS_URL = '/api/v1/titles/{title_id}/reviews/'
+
+    def count(self, client, url):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['count']
+
+    def test_01_reads_go_to_replica(self, client, admin_client, user_client,
+                                    replica):
+        titles, _, _ = create_titles(admin_client)
+        replica()
+        url = self.REVIEWS_URL.format(title_id=titles[0]['id'])
+        response = admin_client.post(url, data={'text': 'Отзыв', 'score': 5})
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что запись идёт в основную БД.'
+        )
+
+        assert self.count(client, url) == 0, (
+            'Проверьте, что GET-запросы читают с реплики.'
+        )
+        assert self.count(user_client, url) == 0
+        assert self.count(admin_client, url) == 1, (
+            'Проверьте, что автор только что созданного отзыва читает из '
+            'основной БД и видит свой отзыв.'
+        )
+
+        replica()
+        assert self.count(client, url) == 1, (
+            'Проверьте, что после синхронизации реплика отдаёт новый отзыв.'
+        )
+
+    def test_02_pin_expires(self, admin, admin_client, replica):
+        from api import replicas
+
+        titles, _, _ = create_titles(admin_client)
+        replica()
+        url = self.REVIEWS_URL.format(title_id=titles[0]['id'])
+        admin_client.post(url, data={'text': 'Отзыв', 'score': 5})
+        assert self.count(admin_client, url) == 1
+
+        replicas.get_cache().delete(replicas.pin_key(admin.pk))
+        assert self.count(admin_client, url) == 0, (
+            'Проверьте, что после окончания окна закрепления пользователь '
+            'снова читает с реплики.'
+        )
+
+    def test_03_without_replicas(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL.format(title_id=titles[0]['id'])
+        admin_client.post(url, data={'text': 'Отзыв', 'score': 5})
+        assert self.count(client, url) == 1
+
+
+class Test27ReplicaStrategies:
+
+    def test_01_round_robin(self, settings):
+        from api.replicas import ROUND_ROBIN, ReplicaRouter
+
+        settings.DATABASE_REPLICA_STRATEGY = ROUND_ROBIN
+        router = ReplicaRouter()
+        chosen = [router.choose(['first', 'second']) for _ in range(4)]
+        assert chosen == ['first', 'second', 'first', 'second']
+
+    def test_02_least_recent(self, settings):
+        from api.replicas import LEAST_RECENT, ReplicaRouter
+
+        settings.DATABASE_REPLICA_STRATEGY = LEAST_RECENT
+        router = ReplicaRouter()
+        assert router.choose(['first', 'second']) == 'first'
+        assert router.choose(['first', 'second']) == 'second'
+        assert router.choose(['first', 'second', 'third']) == 'third', (
+            'Проверьте, что `least_recent` выбирает реплику, к которой '
+            'дольше всех не обращались.'
+        )
+        assert router.choose(['first', 'second', 'third']) == 'first'
+
+    def test_03_outside_requests(self, settings):
+        from api.replicas import ReplicaRouter
+        from reviews.models import Title
+
+        settings.DATABASE_REPLICAS = ['first']
+        router = ReplicaRouter()
+        assert router.db_for_read(Title) is None, (
+            'Проверьте, что вне HTTP-запроса роутер не выбирает реплику.'
+        )
+        assert router.db_for_write(Title) == 'default'
+        assert router.allow_migrate('first', 'reviews') is False
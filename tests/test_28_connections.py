@@ -0,0 +1,145 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28Connections:
+
+    STATS_URL = '/api/v1/_debug/connections/'
+
+    def test_01_persistent_connections(self, admin_client, client):
+        from django.db import connections
+
+        assert connections['default'].settings_dict['CONN_MAX_AGE'] > 0, (
+            'Проверьте, что соединения с БД по умолчанию переиспользуются '
+            'между запросами (`CONN_MAX_AGE`).'
+        )
+        admin_client.delete(self.STATS_URL)
+        for _ in range(3):
+            client.get('/api/v1/categories/')
+        response = admin_client.get(self.STATS_URL)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert data['requests'] == 4, (
+            'Проверьте, что статистика соединений считает запросы процесса.'
+        )
+        assert data['opened'] == 0
+        assert data['churn'] == 0
+        assert client.get(self.STATS_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        )
+
+    def test_02_health_check_closes_broken(self, monkeypatch, settings):
+        from api import db_connections
+
+        db_connections.reset_stats()
+        connection.ensure_connection()
+        monkeypatch.setattr(connection, 'is_usable', lambda: False)
+        settings.DB_CONN_HEALTH_CHECKS = False
+        db_connections.check_connections()
+        assert db_connections.get_stats()['unhealthy'] == 0
+
+        settings.DB_CONN_HEALTH_CHECKS = True
+        db_connections.check_connections()
+        assert db_connections.get_stats()['unhealthy'] == 1, (
+            'Проверьте, что перед повторным использованием разорванное '
+            'соединение закрывается.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28ConnectionPool:
+
+    @pytest.fixture
+    def wrapper(self, settings, tmp_path):
+        from django.db.backends.sqlite3.base import DatabaseWrapper
+
+        from api_yamdb.backends import pool
+
+        class PooledWrapper(pool.PooledDatabaseWrapperMixin, DatabaseWrapper):
+            pass
+
+        settings.DB_POOL_SIZE = 1
+        settings_dict = dict(
+            connection.settings_dict, NAME=str(tmp_path / 'pool.sqlite3')
+        )
+        yield lambda: PooledWrapper(settings_dict, alias='pooled')
+        pool.clear()
+
+    def test_01_connection_is_reused(self, wrapper):
+        from api_yamdb.backends import pool
+
+        first = wrapper()
+        first.ensure_connection()
+        raw = first.connection
+        first.close()
+        assert pool.get_stats()['idle'] == {'pooled': 1}
+
+        # Другой поток получает свой DatabaseWrapper, но то же соединение.
+        second = wrapper()
+        second.ensure_connection()
+        assert second.connection is raw, (
+            'Проверьте, что закрытое соединение возвращается в пул и '
+            'переиспользуется.'
+        )
+        third = wrapper()
+        third.ensure_connection()
+        assert third.connection is not raw
+        second.close()
+        third.close()
+        stats = pool.get_stats()
+        assert stats['idle'] == {'pooled': 1}, (
+            'Проверьте, что пул хранит не больше `DB_POOL_SIZE` соединений.'
+        )
+        assert stats['created'] == 2
+        assert stats['reused'] == 1
+        assert stats['discarded'] == 1
+
+    def test_02_broken_connection_is_replaced(self, wrapper):
+        from api_yamdb.backends import pool
+
+        first = wrapper()
+        first.ensure_connection()
+        raw = first.connection
+        first.close()
+        raw.close()
+
+        second = wrapper()
+        second.ensure_connection()
+        assert second.connection is not raw, (
+            'Проверьте, что соединение из пула проверяется перед выдачей.'
+        )
+        with second.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        assert pool.get_stats()['discarded'] == 1
+        second.close()
+
+    def test_03_transaction_is_not_returned(self, wrapper):
+        from api_yamdb.backends import pool
+
+        first = wrapper()
+        first.ensure_connection()
+        first.set_autocommit(False)
+        first.close()
+        assert pool.get_stats()['idle'] == {'pooled': 0}, (
+            'Проверьте, что соединение с открытой транзакцией не '
+            'возвращается в пул.'
+        )
+
+    def test_04_checkouts_are_not_counted_as_opened(self, wrapper):
+        from api import db_connections
+
+        db_connections.reset_stats()
+        first = wrapper()
+        first.ensure_connection()
+        first.close()
+        second = wrapper()
+        second.ensure_connection()
+        second.close()
+        stats = db_connections.get_stats()
+        assert (stats['opened'], stats['checkouts']) == (1, 1), (
+            'Проверьте, что выдача соединения из пула не считается '
+            'открытием нового соединения.'
+        )
@@ -0,0 +1,134 @@
+import asyncio
+import time
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.urls import include, path, resolve
+
+from api.urls import async_catalogue, v1_router
+from tests.utils import create_titles
+
+# URLconf с асинхронными представлениями каталога для этих тестов.
+urlpatterns = [
+    path('api/v1/', include(async_catalogue(v1_router.urls))),
+]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29AsyncCatalogue:
+
+    URLS = (
+        '/api/v1/categories/',
+        '/api/v1/genres/?search=Рок',
+        '/api/v1/titles/',
+        '/api/v1/titles/?genre=rock&ordering=-year',
+        '/api/v1/titles/?cursor=',
+        '/api/v1/titles/{title_id}/',
+        '/api/v1/titles/999/',
+    )
+
+    def switch(self, settings, async_views):
+        settings.ROOT_URLCONF = (
+            __name__ if async_views else 'api_yamdb.urls'
+        )
+
+    def test_01_same_responses(self, client, admin_client, settings):
+        titles, _, _ = create_titles(admin_client)
+        self.switch(settings, True)
+        assert asyncio.iscoroutinefunction(
+            resolve('/api/v1/titles/').func
+        ), 'Проверьте, что список произведений асинхронный.'
+        for url in self.URLS:
+            url = url.format(title_id=titles[0]['id'])
+            self.switch(settings, False)
+            expected = client.get(url)
+            self.switch(settings, True)
+            response = client.get(url)
+            assert response.status_code == expected.status_code, url
+            assert response.json() == expected.json(), (
+                f'Проверьте, что асинхронное представление `{url}` отдаёт '
+                'тот же ответ, что и синхронное.'
+            )
+            assert response['Content-Type'] == expected['Content-Type']
+
+    def test_02_writes_use_sync_views(self, client, admin_client, settings):
+        self.switch(settings, True)
+        response = admin_client.post(
+            '/api/v1/categories/', data={'name': 'Кино', 'slug': 'movie'}
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что запись в каталог через асинхронный URLconf '
+            'выполняется синхронным представлением.'
+        )
+        response = admin_client.get('/api/v1/categories/')
+        assert response.json()['count'] == 1
+        response = client.post(
+            '/api/v1/categories/', data={'name': 'Книги', 'slug': 'books'}
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_03_concurrent_requests_are_coalesced(self):
+        from api.async_views import coalesce
+
+        calls = []
+
+        def read():
+            calls.append(1)
+            time.sleep(0.05)
+            return len(calls)
+
+        async def main():
+            return await asyncio.gather(
+                *(coalesce('key', read) for _ in range(5))
+            )
+
+        assert async_to_sync(main)() == [1] * 5
+        assert len(calls) == 1, (
+            'Проверьте, что одновременные одинаковые запросы выполняют '
+            'представление один раз.'
+        )
+        assert async_to_sync(main)() == [2] * 5
+
+    def test_04_benchmark_asgi(self, admin_client):
+        create_titles(admin_client)
+        for extra in ((), ('--unique-urls',)):
+            out = StringIO()
+            call_command(
+                'benchmark_asgi', '--clients', '3', '--requests', '4',
+                *extra, stdout=out,
+            )
+            output = out.getvalue()
+            assert 'sync:' in output and 'async:' in output
+            assert 'ошибок 0' in output, output
+            assert 'async/sync' in output
+
+    def test_05_cancelled_leader_does_not_fail_followers(self):
+        from api.async_views import coalesce
+
+        calls = []
+
+        def read():
+            calls.append(1)
+            time.sleep(0.05)
+            return len(calls)
+
+        async def main():
+            leader = asyncio.ensure_future(coalesce('key', read))
+            await asyncio.sleep(0)
+            followers = asyncio.gather(
+                *(coalesce('key', read) for _ in range(3))
+            )
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            return leader, await followers
+
+        leader, results = async_to_sync(main)()
+        assert leader.cancelled()
+        assert results == [1] * 3, (
+            'Проверьте, что отмена первого запроса не отменяет ответ '
+            'остальным одновременным запросам.'
+        )
+        assert len(calls) == 1
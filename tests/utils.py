@@ -305,3 +305,21 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+def migrate_reviews(target=None):
+    """
+    Мигрирует приложение reviews до миграции target (по умолчанию до
+    последней) и возвращает реестр исторических моделей.
+    """
+    from django.db import connection
+    from django.db.migrations.executor import MigrationExecutor
+
+    executor = MigrationExecutor(connection)
+    if target is None:
+        targets = executor.loader.graph.leaf_nodes('reviews')
+    else:
+        targets = [('reviews', target)]
+    executor.migrate(targets)
+    executor.loader.build_graph()
+    return executor.loader.project_state(targets).apps